@@ -0,0 +1,78 @@
+import sys
+import os
+import timeit
+from argparse import ArgumentParser
+import torch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from losses import fused_column_wise_rmse_loss
+
+
+def column_wise_rmse_loss_reference(input, target, reduction="mean", column_weight=None, sample_weight=None):
+    # previous implementation, kept as a timing baseline (equivalence is tested in tests/test_losses.py)
+    squared_error = torch.square(target - input)
+    
+    if sample_weight is not None:
+        squared_error = (squared_error * sample_weight)
+    
+    column_wise_rmse = torch.sqrt(torch.mean(squared_error, dim=0))
+    
+    if column_weight is not None:
+        column_wise_rmse = (column_wise_rmse * column_weight)
+    
+    if reduction == "mean":
+        return torch.mean(column_wise_rmse, dim=0)
+    elif reduction == "max":
+        return torch.max(column_wise_rmse, dim=0).values
+    
+    return column_wise_rmse
+
+
+def benchmark(loss_function, input, target, number: int = 100, **loss_args) -> float:
+    def step():
+        input.grad = None
+        loss = loss_function(input, target, **loss_args)
+        loss.backward()
+    
+    step()
+    
+    return timeit.timeit(step, number=number) / number
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--batch_sizes", nargs="+", default=[32, 1024, 100000], type=int, required=False)
+    parser.add_argument("--num_columns", default=6, type=int, required=False)
+    parser.add_argument("--number", default=100, type=int, required=False)
+    parser.add_argument("--num_threads", default=1, type=int, required=False)
+    args = parser.parse_args()
+    
+    torch.set_num_threads(args.num_threads)
+    
+    column_weight = torch.rand(args.num_columns)
+    scripted_loss = torch.jit.script(fused_column_wise_rmse_loss)
+    
+    loss_functions = {
+        "reference": lambda *args, **kwargs: column_wise_rmse_loss_reference(*args, **kwargs),
+        "fused": lambda *args, **kwargs: fused_column_wise_rmse_loss(*args, **kwargs)[0],
+        "scripted": lambda *args, **kwargs: scripted_loss(*args, **kwargs)[0],
+    }
+    
+    for batch_size in args.batch_sizes:
+        input = torch.rand(batch_size, args.num_columns, requires_grad=True)
+        target = torch.rand(batch_size, args.num_columns)
+        sample_weight = torch.rand(batch_size)
+        
+        for name, loss_function in loss_functions.items():
+            seconds = benchmark(loss_function, input, target, number=args.number, column_weight=column_weight)
+            reference_sample_weight = sample_weight.unsqueeze(-1) if name == "reference" else sample_weight
+            weighted_seconds = benchmark(
+                loss_function, 
+                input, 
+                target, 
+                number=args.number, 
+                column_weight=column_weight, 
+                sample_weight=reference_sample_weight,
+            )
+            print(f"batch size {batch_size}, {name}: {seconds * 1e6:.1f} us, with sample weights: {weighted_seconds * 1e6:.1f} us (forward + backward)")
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import importlib
+from argparse import ArgumentParser
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "parsers"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from page_cache import PageCache
+from extractors import BACKENDS
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--cache_path", required=True)
+    parser.add_argument("--site", default="ivypanda", choices=["ivypanda", "studentshare"], required=False)
+    parser.add_argument("--max_pages", default=1000, type=int, required=False)
+    
+    args = parser.parse_args()
+    
+    site = importlib.import_module(args.site)
+    
+    cache = PageCache(path=args.cache_path)
+    pages = []
+    for url, html in cache.items():
+        pages.append((url, html))
+        if len(pages) >= args.max_pages:
+            break
+    
+    print(f"Extracting {len(pages)} saved pages of '{args.site}'")
+    
+    backends_essays = {}
+    for backend in BACKENDS:
+        essays = []
+        start_time = time.perf_counter()
+        for url, html in pages:
+            try:
+                essay = site.extract_essay_info(html=html, url=url, backend=backend)
+            except Exception:
+                essay = None
+            essays.append(essay)
+        seconds = time.perf_counter() - start_time
+        
+        backends_essays[backend] = essays
+        num_essays = sum(essay is not None for essay in essays)
+        print(f"{backend}: {seconds:.2f} s, {seconds / max(len(pages), 1) * 1e3:.2f} ms per page, {num_essays} essays")
+    
+    reference_backend, *other_backends = BACKENDS
+    for backend in other_backends:
+        num_mismatches = sum(
+            essay != reference_essay 
+            for essay, reference_essay in zip(backends_essays[backend], backends_essays[reference_backend])
+        )
+        print(f"{backend} differs from {reference_backend} on {num_mismatches} pages")
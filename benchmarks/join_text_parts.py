@@ -0,0 +1,51 @@
+import sys
+import os
+import string
+import random
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "transforms"))
+
+from utils import join_text_parts
+
+
+def join_text_parts_concatenation(parts, punctuations=None):
+    # previous implementation, kept as a baseline
+    if punctuations is None:
+        punctuations = string.punctuation 
+    
+    text = ""
+    for part in parts:
+        part = str(part)
+        sep = " " if part[0] not in punctuations else ""  
+        text += sep + part
+    
+    text = text.strip()
+    
+    return text
+
+
+def generate_essay_tokens(num_tokens: int = 1000, seed: int = 42):
+    random_generator = random.Random(seed)
+    vocabulary = ["It", "'s", "example", "!", "the", "students", "n't", ",", ".", "school", "42", "?", "however"]
+    
+    return [random_generator.choice(vocabulary) for _ in range(num_tokens)]
+
+
+if __name__ == "__main__":
+    examples = [
+        ["It", "'s", "example", "!"],
+        ["Hello", ",", "world", "."],
+        ["I", "have", 2, "cats", "..."],
+    ]
+    for example in examples:
+        assert join_text_parts(example) == join_text_parts_concatenation(example)
+
+    num_essays, number = 100, 20
+    essays = [generate_essay_tokens(seed=seed) for seed in range(num_essays)]
+    for essay in essays:
+        assert join_text_parts(essay) == join_text_parts_concatenation(essay)
+    
+    for name, function in (("concatenation", join_text_parts_concatenation), ("join_text_parts", join_text_parts)):
+        seconds = timeit.timeit(lambda: [function(essay) for essay in essays], number=number)
+        print(f"{name}: {seconds / (num_essays * number) * 1e6:.1f} us per 1k-token essay")
@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import tempfile
+from argparse import ArgumentParser
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils import convert_soft_to_hard_predictions, DEFAULT_BINS, DEFAULT_LABELS
+
+
+CUSTOM_BINS = [0.0, 0.5, 1.5, 2.5, 3.5, 4.5]
+CUSTOM_LABELS = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def convert_soft_to_hard_predictions_comprehension(soft_predictions, bins=DEFAULT_BINS, labels=DEFAULT_LABELS):
+    # previous implementation, kept as a baseline (works only for 1-d predictions)
+    soft_predictions = np.clip(soft_predictions, a_min=0.0, a_max=5.0)
+    hard_predictions = np.digitize(soft_predictions, bins=bins, right=True)
+    hard_predictions = [labels[hard_prediction - 1] for hard_prediction in hard_predictions]
+    
+    return hard_predictions
+
+
+def measure(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--num_rows", default=10_000_000, type=int, required=False)
+    parser.add_argument("--num_columns", default=6, type=int, required=False)
+    parser.add_argument("--baseline_size", default=1_000_000, type=int, required=False)
+    parser.add_argument("--chunk_size", default=1_000_000, type=int, required=False)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(42)
+    predictions = rng.uniform(-0.5, 5.5, size=(args.num_rows, args.num_columns)).astype(np.float32)
+    
+    # the baseline maps exact 0.0 to labels[-1], so zeros are excluded from the comparison
+    flat_predictions = predictions.reshape(-1)[:args.baseline_size]
+    flat_predictions = flat_predictions[np.clip(flat_predictions, 0.0, 5.0) > 0.0]
+    baseline, baseline_seconds = measure(convert_soft_to_hard_predictions_comprehension, flat_predictions)
+    hard_predictions, _ = measure(convert_soft_to_hard_predictions, flat_predictions)
+    assert np.array_equal(hard_predictions, np.asarray(baseline, dtype=np.float32))
+    
+    # a non-default grid (whole labels) takes the `np.digitize` lookup instead of rounding
+    custom_baseline = convert_soft_to_hard_predictions_comprehension(flat_predictions, bins=CUSTOM_BINS, labels=CUSTOM_LABELS)
+    custom_grid_predictions, _ = measure(convert_soft_to_hard_predictions, flat_predictions, bins=CUSTOM_BINS, labels=CUSTOM_LABELS)
+    assert np.array_equal(custom_grid_predictions, np.asarray(custom_baseline, dtype=np.float32))
+    
+    baseline_seconds *= predictions.size / len(flat_predictions)
+    print(f"comprehension (extrapolated from {len(flat_predictions)} values): {baseline_seconds:.2f} s")
+    
+    hard_predictions, seconds = measure(convert_soft_to_hard_predictions, predictions)
+    assert hard_predictions.shape == predictions.shape and hard_predictions.dtype == predictions.dtype
+    print(f"vectorized {predictions.shape}: {seconds:.2f} s")
+    
+    _, seconds = measure(convert_soft_to_hard_predictions, predictions, bins=CUSTOM_BINS, labels=CUSTOM_LABELS)
+    print(f"vectorized, digitize lookup {predictions.shape}: {seconds:.2f} s")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "predictions.npy")
+        memmap_predictions = np.lib.format.open_memmap(path, mode="w+", dtype=predictions.dtype, shape=predictions.shape)
+        memmap_predictions[:] = predictions
+        memmap_predictions.flush()
+        del predictions
+        
+        _, seconds = measure(
+            convert_soft_to_hard_predictions, 
+            memmap_predictions, 
+            out=memmap_predictions, 
+            chunk_size=args.chunk_size,
+        )
+        memmap_predictions.flush()
+        assert np.array_equal(memmap_predictions, hard_predictions)
+        print(f"in-place on memory-mapped file, chunks of {args.chunk_size} rows: {seconds:.2f} s")
+        
+        del memmap_predictions
@@ -1,5 +1,31 @@
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
 HEADERS = {
     "User-Agent": 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36',
 }
 
-PARSER = "html.parser"
\ No newline at end of file
+PARSER = "html.parser"
+
+# Parquet/Arrow columns types of the parsed essays, IvyPanda essays may have several subjects
+if pa is not None:
+    IVYPANDA_SCHEMA = pa.schema([
+        ("url", pa.string()), 
+        ("topic", pa.string()), 
+        ("text", pa.string()), 
+        ("subject", pa.list_(pa.string())), 
+        ("type", pa.string()),
+    ])
+    STUDENTSHARE_SCHEMA = pa.schema([
+        ("url", pa.string()), 
+        ("topic", pa.string()), 
+        ("text", pa.string()), 
+        ("subject", pa.string()), 
+        ("type", pa.string()), 
+        ("level", pa.string()),
+    ])
+else:
+    IVYPANDA_SCHEMA, STUDENTSHARE_SCHEMA = None, None
\ No newline at end of file
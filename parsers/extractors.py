@@ -0,0 +1,78 @@
+from functools import lru_cache
+from typing import Any, List, Dict, Iterable
+
+try:
+    import lxml.html
+    from lxml.etree import XPath, Element
+except ImportError:
+    lxml = None
+
+
+BACKENDS = ("bs4", "lxml")
+
+
+def check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"`backend` must be one of {list(BACKENDS)}, but given {backend}")
+    
+    if backend == "lxml" and lxml is None:
+        raise ImportError("`lxml` backend requires lxml, install it with `pip install lxml`")
+
+
+def class_xpath(class_name: str, axis: str = "//") -> str:
+    """
+    XPath of elements having `class_name` among their classes, as BeautifulSoup's `class_` matching.
+    """
+    
+    return f"{axis}*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+@lru_cache(maxsize=None)
+def get_xpath(expression: str) -> Any:
+    """
+    Compiles XPath expression once.
+    """
+    
+    check_backend("lxml")
+    
+    return XPath(expression)
+
+
+def parse_html(html: str) -> Any:
+    check_backend("lxml")
+    
+    return lxml.html.fromstring(html)
+
+
+def find_first(element: Any, expression: str) -> Any:
+    elements = get_xpath(expression)(element)
+    
+    return elements[0] if len(elements) > 0 else None
+
+
+def find_all(element: Any, expression: str) -> List[Any]:
+    return get_xpath(expression)(element)
+
+
+def find_first_by_classes(element: Any, class_names: Iterable[str]) -> Dict[str, Any]:
+    """
+    First descendant having each of `class_names` among its classes, found in a single traversal of the tree.
+    Missing classes are not in the result.
+    """
+    
+    class_names = set(class_names)
+    
+    found_elements = {}
+    for descendant in element.iter(Element):
+        classes = descendant.get("class")
+        if classes is None:
+            continue
+        
+        for class_name in classes.split():
+            if class_name in class_names and class_name not in found_elements:
+                found_elements[class_name] = descendant
+        
+        if len(found_elements) == len(class_names):
+            break
+    
+    return found_elements
@@ -0,0 +1,144 @@
+from typing import Dict, Any, List, Optional, Iterable, Callable
+import threading
+import sqlite3
+import json
+import csv
+import os
+import time
+
+from storage import get_format, ParquetPartsWriter
+
+
+class CrawlFrontier:
+    """
+    Persistent, thread-safe set of discovered URLs with their status: 'pending', 'done' or 'failed'.
+    """
+    
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY, 
+                status TEXT NOT NULL, 
+                updated REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+        
+    def add(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO urls (url, status, updated) VALUES (?, 'pending', ?)", 
+                [(url, now) for url in urls],
+            )
+            self.connection.commit()
+        
+    def set_status(self, url: str, status: str) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO urls (url, status, updated) VALUES (?, ?, ?)", 
+                (url, status, time.time()),
+            )
+            self.connection.commit()
+        
+    def mark_done(self, url: str) -> None:
+        self.set_status(url, "done")
+        
+    def mark_failed(self, url: str) -> None:
+        self.set_status(url, "failed")
+        
+    def is_done(self, url: str) -> bool:
+        with self.lock:
+            row = self.connection.execute("SELECT status FROM urls WHERE url = ?", (url,)).fetchone()
+        
+        return row is not None and row[0] == "done"
+    
+    def get_urls(self, status: str = "pending") -> List[str]:
+        with self.lock:
+            rows = self.connection.execute("SELECT url FROM urls WHERE status = ?", (status,)).fetchall()
+        
+        return [url for (url,) in rows]
+    
+    def count(self, status: str = "done") -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM urls WHERE status = ?", (status,)).fetchone()[0]
+        
+    def close(self) -> None:
+        self.connection.close()
+
+
+class EssaysWriter:
+    """
+    Appends essays to a CSV file (or JSON lines for '.jsonl' paths) one by one, 
+    so nothing has to be kept in memory and a crash loses at most the essay being written.
+    Parquet paths get rotating part files of `rows_per_part` essays typed by `schema` instead.
+    `on_flush` is called with the essays once they are durably written.
+    """
+    
+    def __init__(
+        self, 
+        path: str, 
+        fieldnames: Optional[List[str]] = None, 
+        rows_per_part: int = 1000, 
+        on_flush: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        schema: Optional[Any] = None,
+    ) -> None:
+        self.path = path
+        self.fieldnames = fieldnames
+        self.on_flush = on_flush
+        self.is_jsonl = self.path.endswith(".jsonl")
+        self.parquet_writer = None
+        
+        if not self.is_jsonl and get_format(self.path) == "parquet":
+            self.parquet_writer = ParquetPartsWriter(
+                path=self.path, 
+                rows_per_part=rows_per_part, 
+                on_flush=on_flush, 
+                schema=schema,
+            )
+            return
+        
+        is_empty = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        
+        # appending to an existing CSV keeps its columns order
+        if not self.is_jsonl and not is_empty:
+            with open(self.path, mode="r", encoding="utf-8", newline="") as file:
+                self.fieldnames = next(csv.reader(file))
+        
+        self.write_header = not self.is_jsonl and is_empty
+        self.file = open(self.path, mode="a", encoding="utf-8", newline="")
+        self.csv_writer = None
+        
+    def write(self, essay: Dict[str, Any]) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.write(essay)
+            return
+        
+        if self.is_jsonl:
+            self.file.write(json.dumps(essay, ensure_ascii=False) + "\n")
+        else:
+            if self.csv_writer is None:
+                fieldnames = self.fieldnames if self.fieldnames is not None else list(essay.keys())
+                self.csv_writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+                
+                if self.write_header:
+                    self.csv_writer.writeheader()
+                    
+            self.csv_writer.writerow(essay)
+        
+        self.file.flush()
+        
+        if self.on_flush is not None:
+            self.on_flush([essay])
+        
+    def close(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+        else:
+            self.file.close()
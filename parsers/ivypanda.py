@@ -3,10 +3,24 @@ import pandas as pd
 from tqdm import tqdm
 from bs4 import BeautifulSoup
 from argparse import ArgumentParser
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterator
+from functools import partial
 from IPython.display import display
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import sys
+import os
 
-from constants import HEADERS, PARSER
+if __name__ == "__main__":
+    # the shared storage layer lives in src/
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import HEADERS, PARSER, IVYPANDA_SCHEMA
+from sessions import create_session, fetch, HostRateLimiter
+from frontier import CrawlFrontier, EssaysWriter
+from page_cache import PageCache
+from pipeline import FetchExtractPipeline
+from extractors import check_backend, parse_html, find_first_by_classes, find_all
+from storage import write_table
 
 
 def get_essay_info(
@@ -14,11 +28,70 @@ def get_essay_info(
     headers: Dict[str, Any] = HEADERS, 
     parser: str = PARSER, 
     sep: str = "\n\n", 
+    session: Optional[requests.Session] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    backend: str = "bs4",
     **response_args,
 ) -> Dict[str, Any]:
 
-    response = requests.get(url=url, headers=headers, **response_args)
-    soup = BeautifulSoup(response.text, parser)
+    html = fetch(url=url, session=session, rate_limiter=rate_limiter, headers=headers, **response_args)
+    
+    return extract_essay_info(html=html, url=url, parser=parser, sep=sep, backend=backend)
+
+
+def extract_essay_info_lxml(html: str, url: str, sep: str = "\n\n") -> Dict[str, Any]:
+    """
+    Same extraction as `extract_essay_info` over one lxml tree, the heading, content and details 
+    are found in a single traversal and only searched within afterwards.
+    """
+    
+    root = parse_html(html)
+    elements = find_first_by_classes(root, ("article__heading", "article__content", "paper-details-table__tbody"))
+    
+    topic = elements.get("article__heading").text_content()
+    
+    text_elements = elements.get("article__content").iterchildren()
+    text_parts = [
+        text_element.text_content() for text_element in text_elements 
+        if isinstance(text_element.tag, str) and "div" not in text_element.tag
+    ]
+    
+    text = sep.join(text_parts)
+    
+    details_element = elements.get("paper-details-table__tbody")
+    names = find_all(details_element, ".//th")
+    description_elements = find_all(details_element, ".//td")
+    
+    subject, type_ = None, None
+    for name, description_element in zip(names, description_elements):
+        name = name.text_content().strip()
+        if name == "Type":
+            type_ = description_element.text_content().strip().replace("\n", ", ")
+        elif name == "Subjects":
+            subject = [
+                subject_element.text_content().strip() for subject_element in find_all(description_element, ".//a")
+            ]
+    
+    return {
+        "url": url,
+        "topic": topic,
+        "text": text, 
+        "subject": subject,
+        "type": type_,
+    }
+
+
+def extract_essay_info(
+    html: str, 
+    url: str, 
+    parser: str = PARSER, 
+    sep: str = "\n\n", 
+    backend: str = "bs4",
+) -> Dict[str, Any]:
+    if backend == "lxml":
+        return extract_essay_info_lxml(html=html, url=url, sep=sep)
+    
+    soup = BeautifulSoup(html, parser)
 
     topic = soup.find(class_="article__heading").text
     
@@ -53,6 +126,28 @@ def get_essay_info(
     }
 
 
+def get_page_essays_urls(
+    url: str, 
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    session: Optional[requests.Session] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    **response_args,
+) -> List[str]:
+    html = fetch(url=url, session=session, rate_limiter=rate_limiter, headers=headers, **response_args)
+    soup = BeautifulSoup(html, parser)
+    
+    essays_blocks = soup.find_all(class_="article--list")
+    
+    essays_urls = []
+    for essay_block in essays_blocks:
+        essay_heading_element = essay_block.find(class_="article__heading-link")
+        essay_url = essay_heading_element.get("href")
+        essays_urls.append(essay_url)
+        
+    return essays_urls
+
+
 def get_page_essays(
     url: str, 
     headers: Dict[str, Any] = HEADERS, 
@@ -61,61 +156,400 @@ def get_page_essays(
 ) -> List[Dict[str, Any]]:
     print(f"Parsing '{url}'")
 
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, parser)
-    
-    essays_blocks = soup.find_all(class_="article--list")
+    essays_urls = get_page_essays_urls(url=url, headers=headers, parser=parser)
 
     essays = []
-    for essay_block in tqdm(essays_blocks, total=len(essays_blocks)):
-        essay_heading_element = essay_block.find(class_="article__heading-link")
-        essay_url = essay_heading_element.get("href")
+    for essay_url in tqdm(essays_urls, total=len(essays_urls)):
         essay = get_essay_info(url=essay_url, headers=headers, parser=parser, **essay_args)
         essays.append(essay)
 
     return essays
 
-def parse(
+
+def get_num_pagination_pages(
     url: str, 
-    output_path: str="ivypanda_essays.csv", 
     headers: Dict[str, Any] = HEADERS, 
     parser: str = PARSER, 
-    pagination_page_format: str = "{url}/page/{page}",
-) ->  None:
-    response = requests.get(url=url, headers=headers)
-    soup = BeautifulSoup(response.text, parser)
+    session: Optional[requests.Session] = None,
+    **response_args,
+) -> int:
+    html = fetch(url=url, session=session, headers=headers, **response_args)
+    soup = BeautifulSoup(html, parser)
 
     pagination_block = soup.find(class_="wp-nav-links")
     pagination_elements = pagination_block.findAll("a")
     num_pagination_pages = int(pagination_elements[-1].text)
     
+    return num_pagination_pages
 
-    essays = []
+
+def get_essays_concurrently(
+    url: str, 
+    num_pagination_pages: int, 
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    pagination_page_format: str = "{url}/page/{page}",
+    max_workers: int = 16, 
+    requests_per_second: Optional[float] = 4.0,
+    frontier: Optional[CrawlFrontier] = None,
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    backend: str = "bs4",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetches listing and essay pages with `max_workers` threads sharing one pooled session 
+    and yields essays as soon as they are parsed. At most `max_workers` listing pages are in flight, 
+    the next one is queued only when one is parsed, behind the essay pages it discovered, 
+    so listing and essay fetches overlap. Requests to a host are limited by `requests_per_second`. 
+    URLs already done in `frontier` are skipped.
+    """
+    
+    session = create_session(headers=headers, pool_size=max_workers)
+    rate_limiter = HostRateLimiter(requests_per_second=requests_per_second)
+    fetch_args = dict(headers=headers, parser=parser, session=session, rate_limiter=rate_limiter, cache=cache)
+    pages = iter(range(1, num_pagination_pages + 1))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending_futures = {}
+        
+        def submit_next_page() -> None:
+            page = next(pages, None)
+            if page is None:
+                return
+            
+            page_url = pagination_page_format.format(url=url, page=page)
+            # listing pages are always revalidated to discover new essays
+            page_future = executor.submit(get_page_essays_urls, url=page_url, refresh=True, **fetch_args)
+            pending_futures[page_future] = ("page", page_url)
+        
+        for _ in range(max_workers):
+            submit_next_page()
+        
+        num_failed_pages, num_failed_essays = 0, 0
+        while len(pending_futures) > 0:
+            done_futures, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
+            for future in done_futures:
+                kind, future_url = pending_futures.pop(future)
+                
+                if kind == "page":
+                    try:
+                        essays_urls = future.result()
+                    except Exception as exception:
+                        print(f"Failed to parse '{future_url}': {exception}")
+                        num_failed_pages += 1
+                        submit_next_page()
+                        continue
+                    
+                    if frontier is not None:
+                        frontier.add(essays_urls)
+                        essays_urls = [essay_url for essay_url in essays_urls if not frontier.is_done(essay_url)]
+                    
+                    for essay_url in essays_urls:
+                        essay_future = executor.submit(
+                            get_essay_info, 
+                            url=essay_url, 
+                            refresh=refresh, 
+                            backend=backend, 
+                            **fetch_args,
+                        )
+                        pending_futures[essay_future] = ("essay", essay_url)
+                    
+                    submit_next_page()
+                else:
+                    try:
+                        essay = future.result()
+                    except Exception:
+                        num_failed_essays += 1
+                        if frontier is not None:
+                            frontier.mark_failed(future_url)
+                        continue
+                    
+                    yield essay
+    
+    session.close()
+    
+    if num_failed_pages > 0 or num_failed_essays > 0:
+        print(f"Failed to parse {num_failed_pages} pages and {num_failed_essays} essays")
+
+
+def get_essays_incrementally(
+    url: str, 
+    num_pagination_pages: int, 
+    frontier: CrawlFrontier,
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    pagination_page_format: str = "{url}/page/{page}",
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    backend: str = "bs4",
+) -> Iterator[Dict[str, Any]]:
+    for page in range(1, num_pagination_pages + 1):    
+        page_url = pagination_page_format.format(url=url, page=page)
+        print(f"Parsing '{page_url}'")
+        
+        essays_urls = get_page_essays_urls(url=page_url, headers=headers, parser=parser, cache=cache, refresh=True)
+        frontier.add(essays_urls)
+        
+        for essay_url in tqdm(essays_urls, total=len(essays_urls)):
+            if frontier.is_done(essay_url):
+                continue
+                
+            try:
+                essay = get_essay_info(
+                    url=essay_url, 
+                    headers=headers, 
+                    parser=parser, 
+                    cache=cache, 
+                    refresh=refresh, 
+                    backend=backend,
+                )
+            except Exception:
+                frontier.mark_failed(essay_url)
+                continue
+            
+            yield essay
+
+
+def iterate_essays_urls(
+    url: str, 
+    num_pagination_pages: int, 
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    pagination_page_format: str = "{url}/page/{page}",
+    frontier: Optional[CrawlFrontier] = None,
+    **fetch_args,
+) -> Iterator[str]:
     for page in range(1, num_pagination_pages + 1):    
         page_url = pagination_page_format.format(url=url, page=page)
-        page_essays = get_page_essays(url=page_url)
-        essays.extend(page_essays)
-        print()
+        try:
+            essays_urls = get_page_essays_urls(url=page_url, headers=headers, parser=parser, refresh=True, **fetch_args)
+        except Exception as exception:
+            print(f"Failed to parse '{page_url}': {exception}")
+            continue
+        
+        if frontier is not None:
+            frontier.add(essays_urls)
+            essays_urls = [essay_url for essay_url in essays_urls if not frontier.is_done(essay_url)]
+            
+        yield from essays_urls
+
+
+def get_essays_pipelined(
+    url: str, 
+    num_pagination_pages: int, 
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    pagination_page_format: str = "{url}/page/{page}",
+    max_workers: int = 16, 
+    num_extractors: Optional[int] = None,
+    requests_per_second: Optional[float] = 4.0,
+    frontier: Optional[CrawlFrontier] = None,
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    backend: str = "bs4",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetching threads and extracting processes run as decoupled stages connected by a bounded queue.
+    Listing pages are fetched lazily by a single listing thread feeding the fetching threads.
+    """
+    
+    session = create_session(headers=headers, pool_size=max_workers)
+    rate_limiter = HostRateLimiter(requests_per_second=requests_per_second)
+    
+    essays_urls = iterate_essays_urls(
+        url=url, 
+        num_pagination_pages=num_pagination_pages, 
+        headers=headers, 
+        parser=parser, 
+        pagination_page_format=pagination_page_format, 
+        frontier=frontier, 
+        session=session, 
+        rate_limiter=rate_limiter, 
+        cache=cache,
+    )
+    
+    fetch_func = partial(fetch, session=session, rate_limiter=rate_limiter, headers=headers, cache=cache, refresh=refresh)
+    extract_func = partial(extract_essay_info, parser=parser, backend=backend)
+    
+    num_failed_essays = 0
+    with FetchExtractPipeline(
+        fetch_func=fetch_func, 
+        extract_func=extract_func, 
+        num_fetchers=max_workers, 
+        num_extractors=num_extractors,
+    ) as pipeline:
+        for essay_url, essay in tqdm(pipeline.run(essays_urls)):
+            if essay is None:
+                num_failed_essays += 1
+                if frontier is not None:
+                    frontier.mark_failed(essay_url)
+                continue
+            
+            yield essay
+    
+    session.close()
+    
+    if num_failed_essays > 0:
+        print(f"Failed to parse {num_failed_essays} essays")
+
+
+def parse(
+    url: str, 
+    output_path: str="ivypanda_essays.csv", 
+    headers: Dict[str, Any] = HEADERS, 
+    parser: str = PARSER, 
+    pagination_page_format: str = "{url}/page/{page}",
+    concurrent: bool = False,
+    max_workers: int = 16,
+    requests_per_second: Optional[float] = 4.0,
+    incremental: bool = False,
+    cache_path: Optional[str] = None,
+    refresh_cache: bool = False,
+    backend: str = "bs4",
+    pipeline: bool = False,
+    num_extractors: Optional[int] = None,
+    partition_columns: Optional[List[str]] = None,
+) ->  None:
+    check_backend(backend)
+    
+    cache = PageCache(path=cache_path) if cache_path is not None else None
+    cache_args = dict(cache=cache, refresh=refresh_cache, backend=backend)
+    
+    num_pagination_pages = get_num_pagination_pages(url=url, headers=headers, parser=parser, cache=cache, refresh=True)
+    
+    frontier = CrawlFrontier(path=f"{output_path}.frontier") if incremental else None
+    crawl_args = dict(
+        url=url, 
+        num_pagination_pages=num_pagination_pages, 
+        headers=headers, 
+        parser=parser, 
+        pagination_page_format=pagination_page_format, 
+        **cache_args,
+    )
+    
+    if pipeline:
+        essays = get_essays_pipelined(
+            max_workers=max_workers, 
+            num_extractors=num_extractors, 
+            requests_per_second=requests_per_second, 
+            frontier=frontier, 
+            **crawl_args,
+        )
+    elif concurrent:
+        essays = get_essays_concurrently(
+            max_workers=max_workers, 
+            requests_per_second=requests_per_second, 
+            frontier=frontier, 
+            **crawl_args,
+        )
+    elif incremental:
+        essays = get_essays_incrementally(frontier=frontier, **crawl_args)
+    else:
+        essays = []
+        for page in range(1, num_pagination_pages + 1):    
+            page_url = pagination_page_format.format(url=url, page=page)
+            page_essays = get_page_essays(url=page_url, **cache_args)
+            essays.extend(page_essays)
+            print()
+    
+    if incremental:
+        # essays are streamed to the output, URLs done in previous runs are skipped
+        def mark_done(written_essays: List[Dict[str, Any]]) -> None:
+            for essay in written_essays:
+                frontier.mark_done(essay["url"])
+        
+        writer = EssaysWriter(path=output_path, on_flush=mark_done, schema=IVYPANDA_SCHEMA)
+        
+        num_essays = 0
+        for essay in essays:
+            writer.write(essay)
+            num_essays += 1
+        
+        print(f"{num_essays} new essays were appended to '{output_path}', {frontier.count('done')} essays in total")
+        
+        writer.close()
+        frontier.close()
+        
+        return
+    
+    essays = list(essays)
 
     num_essays = len(essays)
     print(f"Totally parsed {num_essays} essays")
 
     essays_data_frame = pd.DataFrame.from_dict(essays)
-    essays_data_frame.to_csv(output_path, index=False)
+    write_table(essays_data_frame, output_path, partition_columns=partition_columns, schema=IVYPANDA_SCHEMA)
     display(essays_data_frame)
     print(f"{num_essays} essays were saved to '{output_path}'")
 
 
+def replay_cache(
+    cache_path: str, 
+    output_path: str = "ivypanda_essays.csv", 
+    parser: str = PARSER, 
+    backend: str = "bs4",
+) -> None:
+    """
+    Extracts essays from the cached raw pages only, without any requests.
+    """
+    
+    cache = PageCache(path=cache_path)
+    
+    essays = []
+    for url, html in tqdm(cache.items(), total=len(cache)):
+        # listing pages have no essay details and are skipped
+        try:
+            essay = extract_essay_info(html=html, url=url, parser=parser, backend=backend)
+        except Exception:
+            continue
+            
+        essays.append(essay)
+    
+    cache.close()
+    
+    essays_data_frame = pd.DataFrame.from_dict(essays)
+    write_table(essays_data_frame, output_path, schema=IVYPANDA_SCHEMA)
+    print(f"{len(essays)} essays were extracted from '{cache_path}' and saved to '{output_path}'")
+
+
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("--url", required=True)
     parser.add_argument("--output_path", default="ivypanda_essays.csv", required=False)
     parser.add_argument("--pagination_page_format", default="{url}/page/{page}", required=False)
+    parser.add_argument("--concurrent", action="store_true", required=False)
+    parser.add_argument("--max_workers", default=16, type=int, required=False)
+    parser.add_argument("--requests_per_second", default=4.0, type=float, required=False)
+    parser.add_argument("--incremental", action="store_true", required=False)
+    parser.add_argument("--cache_path", default=None, required=False)
+    parser.add_argument("--refresh_cache", action="store_true", required=False)
+    parser.add_argument("--replay_cache", action="store_true", required=False)
+    parser.add_argument("--backend", default="bs4", choices=["bs4", "lxml"], required=False)
+    parser.add_argument("--pipeline", action="store_true", required=False)
+    parser.add_argument("--num_extractors", default=None, type=int, required=False)
+    parser.add_argument("--partition_columns", nargs="+", default=None, required=False)
 
     args = parser.parse_args()
+    
+    if args.replay_cache:
+        if args.cache_path is None:
+            parser.error("`--replay_cache` requires `--cache_path`")
+        
+        replay_cache(cache_path=args.cache_path, output_path=args.output_path, backend=args.backend)
+        exit()
 
     parse(
         url=args.url, 
         output_path=args.output_path, 
         pagination_page_format=args.pagination_page_format,
+        concurrent=args.concurrent,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+        incremental=args.incremental,
+        cache_path=args.cache_path,
+        refresh_cache=args.refresh_cache,
+        backend=args.backend,
+        pipeline=args.pipeline,
+        num_extractors=args.num_extractors,
+        partition_columns=args.partition_columns,
     )
\ No newline at end of file
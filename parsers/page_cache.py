@@ -0,0 +1,82 @@
+from typing import Optional, Iterator, Tuple, Dict, Any
+import threading
+import sqlite3
+import zlib
+import time
+
+
+class PageCache:
+    """
+    Thread-safe SQLite cache of zlib-compressed raw pages with their ETag and Last-Modified headers,
+    so pages can be revalidated with conditional requests and extraction can be replayed offline.
+    """
+    
+    def __init__(self, path: str = "pages_cache.sqlite", compression_level: int = 6) -> None:
+        self.path = path
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+        
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, 
+                content BLOB NOT NULL, 
+                etag TEXT, 
+                last_modified TEXT, 
+                fetched REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+        
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT content, etag, last_modified FROM pages WHERE url = ?", (url,),
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        content, etag, last_modified = row
+        
+        return {
+            "html": zlib.decompress(content).decode("utf-8"),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+    
+    def set(self, url: str, html: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        content = zlib.compress(html.encode("utf-8"), self.compression_level)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages (url, content, etag, last_modified, fetched) VALUES (?, ?, ?, ?, ?)", 
+                (url, content, etag, last_modified, time.time()),
+            )
+            self.connection.commit()
+            
+    def touch(self, url: str) -> None:
+        with self.lock:
+            self.connection.execute("UPDATE pages SET fetched = ? WHERE url = ?", (time.time(), url))
+            self.connection.commit()
+        
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterates over (url, html) of all cached pages.
+        """
+        
+        with self.lock:
+            urls = [url for (url,) in self.connection.execute("SELECT url FROM pages")]
+        
+        for url in urls:
+            page = self.get(url)
+            if page is not None:
+                yield url, page["html"]
+                
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        
+    def close(self) -> None:
+        self.connection.close()
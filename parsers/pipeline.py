@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional, Tuple
+import threading
+import queue
+
+
+class FetchExtractPipeline:
+    """
+    Producer/consumer pipeline: a listing thread consumes the URLs iterator into a bounded queue, 
+    `num_fetchers` threads fetch pages with `fetch_func(url)` into another bounded queue 
+    and a pool of `num_extractors` processes runs `extract_func(html, url)` on them. 
+    The URLs iterator (e.g. listing pages or a browser) is only ever advanced by the listing thread.
+    At most `queue_size` fetched pages and `queue_size` pending extractions are kept, so memory stays flat.
+    """
+    
+    def __init__(
+        self, 
+        fetch_func: Callable[[str], str], 
+        extract_func: Callable[[str, str], Dict[str, Any]], 
+        num_fetchers: int = 16, 
+        num_extractors: Optional[int] = None, 
+        queue_size: int = 256,
+    ) -> None:
+        self.fetch_func = fetch_func
+        self.extract_func = extract_func
+        self.num_fetchers = num_fetchers
+        self.num_extractors = num_extractors
+        self.queue_size = queue_size
+        self.executor = None
+        
+    def __enter__(self) -> "FetchExtractPipeline":
+        self.executor = ProcessPoolExecutor(max_workers=self.num_extractors)
+        
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.executor.shutdown()
+        self.executor = None
+        
+    def lister(self, urls: Iterable[str], urls_queue: queue.Queue) -> None:
+        try:
+            for url in urls:
+                # blocks while fetchers are behind
+                urls_queue.put(url)
+        except Exception as exception:
+            print(f"Failed to get URLs: {exception}")
+        finally:
+            for _ in range(self.num_fetchers):
+                urls_queue.put(None)
+        
+    def fetcher(self, urls_queue: queue.Queue, pages: queue.Queue) -> None:
+        try:
+            while True:
+                url = urls_queue.get()
+                if url is None:
+                    break
+                
+                try:
+                    html = self.fetch_func(url)
+                except Exception:
+                    html = None
+                    
+                # blocks while extraction is behind
+                pages.put((url, html))
+        finally:
+            pages.put(None)
+            
+    @staticmethod
+    def get_result(url: str, future: Future) -> Tuple[str, Optional[Dict[str, Any]]]:
+        try:
+            return url, future.result()
+        except Exception:
+            return url, None
+        
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Yields (url, extracted data) in completion order, data is None for failed pages.
+        """
+        
+        urls_queue = queue.Queue(maxsize=self.queue_size)
+        pages = queue.Queue(maxsize=self.queue_size)
+        
+        lister = threading.Thread(target=self.lister, args=(urls, urls_queue), daemon=True)
+        lister.start()
+        
+        fetchers = [
+            threading.Thread(target=self.fetcher, args=(urls_queue, pages), daemon=True) 
+            for _ in range(self.num_fetchers)
+        ]
+        for fetcher in fetchers:
+            fetcher.start()
+        
+        pending_futures = {}
+        num_finished_fetchers = 0
+        while num_finished_fetchers < len(fetchers):
+            page = pages.get()
+            
+            if page is None:
+                num_finished_fetchers += 1
+            else:
+                url, html = page
+                if html is None:
+                    yield url, None
+                else:
+                    future = self.executor.submit(self.extract_func, html, url)
+                    pending_futures[future] = url
+            
+            # backpressure: stop taking pages until extraction catches up
+            if len(pending_futures) >= self.queue_size:
+                done_futures, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
+            else:
+                done_futures = [future for future in pending_futures if future.done()]
+            
+            for future in done_futures:
+                yield self.get_result(pending_futures.pop(future), future)
+        
+        for future, url in pending_futures.items():
+            yield self.get_result(url, future)
+        
+        lister.join()
+        for fetcher in fetchers:
+            fetcher.join()
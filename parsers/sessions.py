@@ -0,0 +1,117 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+from typing import Dict, Any, Optional
+import threading
+import time
+
+from constants import HEADERS
+from page_cache import PageCache
+
+
+def create_session(
+    headers: Dict[str, Any] = HEADERS, 
+    pool_size: int = 16, 
+    max_retries: int = 3, 
+    backoff_factor: float = 0.5,
+) -> requests.Session:
+    """
+    Session with a connection pool of `pool_size` keep-alive connections per host 
+    and retries of transient failures.
+    """
+    
+    retry = Retry(
+        total=max_retries, 
+        backoff_factor=backoff_factor, 
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    return session
+
+
+class HostRateLimiter:
+    """
+    Thread-safe politeness limit of `requests_per_second` requests to each host.
+    """
+    
+    def __init__(self, requests_per_second: Optional[float] = 4.0) -> None:
+        self.requests_per_second = requests_per_second
+        self.lock = threading.Lock()
+        self.next_request_times = {}
+        
+    def wait(self, url: str) -> None:
+        if self.requests_per_second is None:
+            return
+        
+        host = urlparse(url).netloc
+        interval = 1.0 / self.requests_per_second
+        
+        # reserving the next slot of the host, sleeping outside of the lock
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_times.get(host, now))
+            self.next_request_times[host] = request_time + interval
+            
+        delay = request_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def fetch(
+    url: str, 
+    session: Optional[requests.Session] = None, 
+    rate_limiter: Optional[HostRateLimiter] = None, 
+    headers: Dict[str, Any] = HEADERS, 
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    raise_for_status: bool = False,
+    **response_args,
+) -> str:
+    """
+    Returns page's HTML. Cached pages are returned without any request, 
+    with `refresh` they are revalidated with a conditional request instead.
+    """
+    
+    cached_page = cache.get(url) if cache is not None else None
+    if cached_page is not None and not refresh:
+        return cached_page["html"]
+    
+    request_headers = dict(headers) if session is None else {}
+    if cached_page is not None:
+        if cached_page["etag"] is not None:
+            request_headers["If-None-Match"] = cached_page["etag"]
+        if cached_page["last_modified"] is not None:
+            request_headers["If-Modified-Since"] = cached_page["last_modified"]
+    
+    if rate_limiter is not None:
+        rate_limiter.wait(url)
+    
+    if session is None:
+        response = requests.get(url=url, headers=request_headers, **response_args)
+    else:
+        response = session.get(url=url, headers=request_headers, **response_args)
+    
+    if cached_page is not None and response.status_code == 304:
+        cache.touch(url)
+        return cached_page["html"]
+    
+    if raise_for_status:
+        response.raise_for_status()
+    
+    if cache is not None and response.ok:
+        cache.set(
+            url=url, 
+            html=response.text, 
+            etag=response.headers.get("ETag"), 
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        
+    return response.text
\ No newline at end of file
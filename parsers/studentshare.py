@@ -2,16 +2,33 @@ import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions
 from argparse import ArgumentParser
 from IPython.display import display
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Callable, Iterable, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures, FIRST_COMPLETED
+from functools import partial
+from urllib.parse import urljoin
 from tqdm import tqdm
 import pandas as pd
 import warnings
 import re
 import time
+import sys
+import os
 
-from constants import PARSER, HEADERS
+if __name__ == "__main__":
+    # the shared storage layer lives in src/
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import PARSER, HEADERS, STUDENTSHARE_SCHEMA
+from sessions import fetch, create_session
+from page_cache import PageCache
+from pipeline import FetchExtractPipeline
+from extractors import check_backend, parse_html, class_xpath, find_first, find_all, find_first_by_classes
+from storage import write_table
 
 
 warnings.simplefilter("ignore")
@@ -22,37 +39,220 @@ def get_essay_info(
     parser: str = PARSER, 
     headers: Dict[str, Any] = HEADERS, 
     sep: str = "\n\n",
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    backend: str = "bs4",
+    session: Optional[requests.Session] = None,
 ) -> Dict[str, Any]:
     try:
-        response = requests.get(url=url, headers=headers)
-        soup = BeautifulSoup(response.text, parser)
+        html = fetch(url=url, session=session, headers=headers, cache=cache, refresh=refresh)
         
-        element = soup.find(class_="extract_sample_bl")
+        return extract_essay_info(html=html, url=url, parser=parser, sep=sep, backend=backend)
+    except Exception:
+        return None
 
-        topic = element.find("h2").text
-        topic_pattern = r'"(.*?)"'
-        topic = re.findall(topic_pattern, topic)[0]
-        
-        text_element = element.find(class_="content")
-        text_parts_elements = text_element.findAll("p")
-        text_parts = [text_art_element.text for text_art_element in text_parts_elements]
-        text = sep.join(text_parts)
+
+def get_essay(
+    url: str, 
+    session: requests.Session, 
+    parser: str = PARSER, 
+    sep: str = "\n\n",
+    cache: Optional[PageCache] = None,
+    refresh: bool = False,
+    backend: str = "bs4",
+) -> Dict[str, Any]:
+    """
+    Same as `get_essay_info`, but raises on HTTP and extraction errors instead of returning None.
+    """
+    
+    html = fetch(url=url, session=session, cache=cache, refresh=refresh, raise_for_status=True)
+    
+    return extract_essay_info(html=html, url=url, parser=parser, sep=sep, backend=backend)
+
+
+def get_failure_type(exception: Exception) -> str:
+    if isinstance(exception, requests.HTTPError):
+        return "http_error"
+    elif isinstance(exception, requests.RequestException):
+        return "connection_error"
+    
+    return "extraction_error"
+
+
+def get_essays_concurrently(
+    essays_urls: Iterable[str], 
+    session: requests.Session, 
+    max_workers: int = 16, 
+    **essay_args,
+) -> Tuple[List[Dict[str, Any]], Counter]:
+    """
+    Fetches essays with `max_workers` threads sharing the (logged-in) pooled session, transient failures 
+    are retried by the session. URLs are consumed lazily, so they can come from the browser.
+    Returns essays and counts of failures by type.
+    """
+    
+    essays, failures = [], Counter()
+    essays_urls = iter(essays_urls)
+    max_pending = max_workers * 4
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending_futures = set()
+        progress_bar = tqdm()
         
-        essay_info_element = soup.find(class_="info_document")
-        essay_info_elements = essay_info_element.findAll("a")
-        essay_info_texts = [essay_info_element.text for essay_info_element in essay_info_elements]
-        subject, type_, level, *_ = essay_info_texts
+        while True:
+            for essay_url in essays_urls:
+                pending_futures.add(executor.submit(get_essay, url=essay_url, session=session, **essay_args))
+                if len(pending_futures) >= max_pending:
+                    break
+            
+            if len(pending_futures) == 0:
+                break
+            
+            done_futures, pending_futures = wait_futures(pending_futures, return_when=FIRST_COMPLETED)
+            for future in done_futures:
+                try:
+                    essays.append(future.result())
+                except Exception as exception:
+                    failures[get_failure_type(exception)] += 1
+                    
+                progress_bar.update(1)
         
-        return {
-            "url": url,
-            "topic": topic,
-            "text": text,
-            "subject": subject,
-            "type": type_,
-            "level": level,
-        }
-    except:
-        return None
+        progress_bar.close()
+    
+    return essays, failures
+
+
+def extract_essay_info_lxml(html: str, url: str, sep: str = "\n\n") -> Dict[str, Any]:
+    """
+    Same extraction as `extract_essay_info` over one lxml tree, the sample and its details 
+    are found in a single traversal and only searched within afterwards.
+    """
+    
+    root = parse_html(html)
+    elements = find_first_by_classes(root, ("extract_sample_bl", "info_document"))
+    
+    element = elements.get("extract_sample_bl")
+    
+    topic = find_first(element, ".//h2").text_content()
+    topic_pattern = r'"(.*?)"'
+    topic = re.findall(topic_pattern, topic)[0]
+    
+    text_element = find_first(element, class_xpath("content", axis=".//"))
+    text_parts = [text_part_element.text_content() for text_part_element in find_all(text_element, ".//p")]
+    text = sep.join(text_parts)
+    
+    essay_info_element = elements.get("info_document")
+    essay_info_texts = [essay_info_element.text_content() for essay_info_element in find_all(essay_info_element, ".//a")]
+    subject, type_, level, *_ = essay_info_texts
+    
+    return {
+        "url": url,
+        "topic": topic,
+        "text": text,
+        "subject": subject,
+        "type": type_,
+        "level": level,
+    }
+
+
+def extract_essay_info(
+    html: str, 
+    url: str, 
+    parser: str = PARSER, 
+    sep: str = "\n\n", 
+    backend: str = "bs4",
+) -> Dict[str, Any]:
+    if backend == "lxml":
+        return extract_essay_info_lxml(html=html, url=url, sep=sep)
+    
+    soup = BeautifulSoup(html, parser)
+    
+    element = soup.find(class_="extract_sample_bl")
+
+    topic = element.find("h2").text
+    topic_pattern = r'"(.*?)"'
+    topic = re.findall(topic_pattern, topic)[0]
+    
+    text_element = element.find(class_="content")
+    text_parts_elements = text_element.findAll("p")
+    text_parts = [text_art_element.text for text_art_element in text_parts_elements]
+    text = sep.join(text_parts)
+    
+    essay_info_element = soup.find(class_="info_document")
+    essay_info_elements = essay_info_element.findAll("a")
+    essay_info_texts = [essay_info_element.text for essay_info_element in essay_info_elements]
+    subject, type_, level, *_ = essay_info_texts
+    
+    return {
+        "url": url,
+        "topic": topic,
+        "text": text,
+        "subject": subject,
+        "type": type_,
+        "level": level,
+    }
+
+
+def wait(
+    driver, 
+    delay: float, 
+    condition: Optional[Callable] = None, 
+    explicit_waits: bool = False, 
+    timeout: float = 30.0,
+) -> None:
+    """
+    Sleeps for fixed `delay`, or with `explicit_waits` waits only until `condition` holds.
+    """
+    
+    if explicit_waits and condition is not None:
+        WebDriverWait(driver, timeout).until(condition)
+    else:
+        time.sleep(delay)
+
+
+def section_is_expanded(section_element) -> Callable:
+    """
+    Condition of a filter section's content (anything but its title) being displayed.
+    """
+    
+    def condition(driver) -> bool:
+        content_elements = section_element.find_elements(by=By.XPATH, value="./*[not(contains(@class, 'title'))]")
+        return any(content_element.is_displayed() for content_element in content_elements)
+    
+    return condition
+
+
+def create_driver(
+    chrome_driver_path: str, 
+    window_width: int = 1980, 
+    window_height: int = 1280, 
+    headless: bool = False,
+):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    
+    driver = webdriver.Chrome(chrome_driver_path, options=options)
+    driver.set_window_size(window_width, window_height)
+    
+    return driver
+
+
+def session_from_driver(driver, headers: Dict[str, Any] = HEADERS, pool_size: int = 16) -> requests.Session:
+    """
+    Pooled HTTP session carrying browser's cookies, e.g. of the logged-in user.
+    """
+    
+    session = create_session(headers=headers, pool_size=pool_size)
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            name=cookie["name"], 
+            value=cookie["value"], 
+            domain=cookie.get("domain"), 
+            path=cookie.get("path", "/"),
+        )
+    
+    return session
 
 
 def set_filter_inputs(
@@ -62,12 +262,20 @@ def set_filter_inputs(
     value_delay: float = 3.0,
     menu_delay: float = 5.0, 
     menu_xpath: str = '//*[@id="ui-id-1"]',
+    explicit_waits: bool = False,
+    timeout: float = 30.0,
 ) -> None:
     input_element = driver.find_element(by=By.XPATH, value=xpath)
     for value in values:
         driver.implicitly_wait(value_delay)
         input_element.send_keys(value)
-        time.sleep(menu_delay)
+        wait(
+            driver, 
+            delay=menu_delay, 
+            condition=expected_conditions.visibility_of_element_located((By.XPATH, menu_xpath)), 
+            explicit_waits=explicit_waits, 
+            timeout=timeout,
+        )
         
         menu_element = driver.find_element(by=By.XPATH, value=menu_xpath)
         menu_options = menu_element.find_elements(by=By.TAG_NAME, value="li")
@@ -121,26 +329,36 @@ def filter_results(
     min_amount_of_words: Optional[int] = None, 
     max_amount_of_words: Optional[int] = None, 
     levels: Optional[List[str]] = None, 
+    explicit_waits: bool = False,
+    timeout: float = 30.0,
 ) -> None:  
 
+    wait_args = dict(explicit_waits=explicit_waits, timeout=timeout)
+    apply_button_xpath = '//*[@id="filters-form"]/button[1]'
+    
     # openning all settings
     filter_element = driver.find_element(by=By.CLASS_NAME, value="filtr_container")
-    unwrap_elements = filter_element.find_elements(by=By.CLASS_NAME, value="section_filtr_bl")
-    unwrap_elements = [
-        unwrap_element.find_element(by=By.CLASS_NAME, value="title") for unwrap_element in unwrap_elements
-    ]
+    section_elements = filter_element.find_elements(by=By.CLASS_NAME, value="section_filtr_bl")
 
-    for unwrap_element in unwrap_elements:
+    for section_element in section_elements:
+        unwrap_element = section_element.find_element(by=By.CLASS_NAME, value="title")
         driver.execute_script("arguments[0].click();", unwrap_element)
-        time.sleep(2)
+        wait(driver, delay=2, condition=section_is_expanded(section_element), **wait_args)
 
-    time.sleep(3)
+    wait(
+        driver, 
+        delay=3, 
+        condition=expected_conditions.element_to_be_clickable((By.XPATH, apply_button_xpath)), 
+        **wait_args,
+    )
 
     if document_types is not None:
         set_filter_inputs(
             driver=driver, 
             xpath='//*[@id="3"]/div[2]/div[2]/div[1]/div/div/div[3]/input', 
             values=document_types,
+            explicit_waits=explicit_waits,
+            timeout=timeout,
         )
     
     if subjects is not None:
@@ -148,6 +366,8 @@ def filter_results(
             driver=driver, 
             xpath='//*[@id="3"]/div[2]/div[2]/div[1]/div/div/div[4]/input', 
             values=subjects,
+            explicit_waits=explicit_waits,
+            timeout=timeout,
         )
     
     if min_pages is not None or max_pages is not None:
@@ -182,7 +402,7 @@ def filter_results(
             values=levels,
         )
 
-    apply_button_element = driver.find_element(by=By.XPATH, value='//*[@id="filters-form"]/button[1]')
+    apply_button_element = driver.find_element(by=By.XPATH, value=apply_button_xpath)
     driver.execute_script("arguments[0].click();", apply_button_element)
 
 
@@ -193,39 +413,173 @@ def login(
     url: str = "https://studentshare.org/login", 
     loading_page_delay: float = 5.0, 
     input_delay: float = 3.0,
+    explicit_waits: bool = False,
+    timeout: float = 30.0,
 ) -> None:
+    wait_args = dict(explicit_waits=explicit_waits, timeout=timeout)
+    email_xpath = '//*[@id="loginform-email"]'
+    password_xpath = '//*[@id="loginform-password_hash"]'
+    checkboxes_xpath = '//*[@id="sign_in"]/div/div/div/div[1]/div[1]/p/label'
+    login_button_xpath = '//*[@id="sign_in"]/div/div/div/div[1]/input'
+    
     driver.get(url)
-    time.sleep(loading_page_delay)
+    wait(
+        driver, 
+        delay=loading_page_delay, 
+        condition=expected_conditions.presence_of_element_located((By.XPATH, email_xpath)), 
+        **wait_args,
+    )
     
     # email
-    email_input_element = driver.find_element(by=By.XPATH, value='//*[@id="loginform-email"]')
+    email_input_element = driver.find_element(by=By.XPATH, value=email_xpath)
     email_input_element.send_keys(email)
-    time.sleep(input_delay)    
+    wait(
+        driver, 
+        delay=input_delay, 
+        condition=expected_conditions.element_to_be_clickable((By.XPATH, password_xpath)), 
+        **wait_args,
+    )
 
     # password
-    password_input_element = driver.find_element(by=By.XPATH, value='//*[@id="loginform-password_hash"]')
+    password_input_element = driver.find_element(by=By.XPATH, value=password_xpath)
     password_input_element.send_keys(password)
-    time.sleep(input_delay)    
+    wait(
+        driver, 
+        delay=input_delay, 
+        condition=expected_conditions.element_to_be_clickable((By.XPATH, checkboxes_xpath)), 
+        **wait_args,
+    )
 
     # checkboxes
-    checkboxes_element = driver.find_element(by=By.XPATH, value='//*[@id="sign_in"]/div/div/div/div[1]/div[1]/p/label')
+    checkboxes_element = driver.find_element(by=By.XPATH, value=checkboxes_xpath)
     checkboxes_element.click()
-    time.sleep(input_delay)
+    wait(
+        driver, 
+        delay=input_delay, 
+        condition=expected_conditions.element_to_be_clickable((By.XPATH, login_button_xpath)), 
+        **wait_args,
+    )
 
     # login button
-    login_button_element = driver.find_element(by=By.XPATH, value='//*[@id="sign_in"]/div/div/div/div[1]/input')
+    login_button_element = driver.find_element(by=By.XPATH, value=login_button_xpath)
     login_button_element.click()
-    time.sleep(input_delay)
+    wait(driver, delay=input_delay, condition=expected_conditions.url_changes(url), **wait_args)
 
 
-def get_essays(driver) -> List[Dict[str, Any]]:
-    essays = []
+def get_essays_urls(driver) -> List[str]:
+    essays_urls = []
     essays_blocks = driver.find_elements(by=By.CLASS_NAME, value="c_p")
-    for essay_block in tqdm(essays_blocks, total=len(essays_blocks)):
+    for essay_block in essays_blocks:
         essay_content = essay_block.find_element(by=By.CLASS_NAME, value="product_content")
         essay_url_element = essay_content.find_element(by=By.TAG_NAME, value="a")
         essay_url = essay_url_element.get_attribute("href")
-        essay = get_essay_info(url=essay_url)
+        essays_urls.append(essay_url)
+        
+    return essays_urls
+
+
+def get_first_essay_block(driver):
+    essays_blocks = driver.find_elements(by=By.CLASS_NAME, value="c_p")
+    
+    return essays_blocks[0] if len(essays_blocks) > 0 else None
+
+
+def wait_for_results(
+    driver, 
+    old_essay_block, 
+    delay: float, 
+    explicit_waits: bool = False, 
+    timeout: float = 30.0,
+) -> None:
+    """
+    Waits until the results list is replaced, i.e. previously shown essay block is detached.
+    """
+    
+    if old_essay_block is not None:
+        condition = expected_conditions.staleness_of(old_essay_block)
+    else:
+        condition = expected_conditions.presence_of_element_located((By.CLASS_NAME, "c_p"))
+        
+    wait(driver, delay=delay, condition=condition, explicit_waits=explicit_waits, timeout=timeout)
+
+
+def open_next_page(
+    driver, 
+    loading_page_delay: float = 10.0, 
+    explicit_waits: bool = False, 
+    timeout: float = 30.0,
+) -> bool:
+    pagination_block = driver.find_element(by=By.CLASS_NAME, value="pagination")
+    pagination_elements = pagination_block.find_elements(by=By.TAG_NAME, value="li")
+    next_page_button_element = pagination_elements[-1]
+
+    if next_page_button_element.get_attribute("class") == "next disabled":
+        return False
+    
+    old_essay_block = get_first_essay_block(driver)
+    next_page_button = next_page_button_element.find_element(by=By.TAG_NAME, value="a")
+    driver.execute_script("arguments[0].click();", next_page_button)
+    wait_for_results(
+        driver, 
+        old_essay_block=old_essay_block, 
+        delay=loading_page_delay, 
+        explicit_waits=explicit_waits, 
+        timeout=timeout,
+    )
+    
+    return True
+
+
+def iterate_essays_urls(
+    driver, 
+    loading_page_delay: float = 10.0, 
+    explicit_waits: bool = False, 
+    timeout: float = 30.0,
+) -> Iterator[str]:
+    page = 1
+    while True:
+        print(f"Parsing {page} page")
+        yield from get_essays_urls(driver)
+        
+        if not open_next_page(driver, loading_page_delay=loading_page_delay, explicit_waits=explicit_waits, timeout=timeout):
+            break
+        
+        page += 1
+
+
+def iterate_essays_urls_http(
+    session: requests.Session, 
+    url: str, 
+    parser: str = PARSER,
+) -> Iterator[str]:
+    """
+    Follows listing pages with plain HTTP requests starting from the filtered results `url`, 
+    the browser is needed only to log in and to apply filters.
+    """
+    
+    page, page_url = 1, url
+    while page_url is not None:
+        print(f"Parsing {page} page")
+        html = fetch(url=page_url, session=session)
+        soup = BeautifulSoup(html, parser)
+        
+        for essay_block in soup.find_all(class_="c_p"):
+            essay_url_element = essay_block.find(class_="product_content").find("a")
+            yield urljoin(page_url, essay_url_element.get("href"))
+        
+        next_page_element = soup.select_one(".pagination li.next a")
+        if next_page_element is not None and next_page_element.get("href"):
+            page_url = urljoin(page_url, next_page_element.get("href"))
+            page += 1
+        else:
+            page_url = None
+
+
+def get_essays(driver, **essay_args) -> List[Dict[str, Any]]:
+    essays = []
+    essays_urls = get_essays_urls(driver)
+    for essay_url in tqdm(essays_urls, total=len(essays_urls)):
+        essay = get_essay_info(url=essay_url, **essay_args)
 
         if essay is not None:
             essays.append(essay)
@@ -242,22 +596,50 @@ def parse(
     output_path: str = "studentshare_essays.csv",
     loading_page_delay: float = 10.0, 
     loading_results_delay: float = 10.0,
+    cache_path: Optional[str] = None,
+    refresh_cache: bool = False,
+    backend: str = "bs4",
+    pipeline: bool = False,
+    num_fetchers: int = 16,
+    num_extractors: Optional[int] = None,
+    headless: bool = False,
+    explicit_waits: bool = False,
+    wait_timeout: float = 30.0,
+    http_listing: bool = False,
+    login_url: str = "https://studentshare.org/login",
+    concurrent: bool = False,
+    partition_columns: Optional[List[str]] = None,
     **filter_args,
 ) -> None:
-    driver = webdriver.Chrome(chrome_driver_path)
-    driver.set_window_size(window_width, window_height)    
+    check_backend(backend)
+    
+    cache = PageCache(path=cache_path) if cache_path is not None else None
+    wait_args = dict(explicit_waits=explicit_waits, timeout=wait_timeout)
+    
+    driver = create_driver(
+        chrome_driver_path=chrome_driver_path, 
+        window_width=window_width, 
+        window_height=window_height, 
+        headless=headless,
+    )
 
     # login
     if email is not None and password is not None:
-        login(driver, email=email, password=password)
+        login(driver, email=email, password=password, url=login_url, **wait_args)
 
 
     driver.get(url)
-    time.sleep(loading_page_delay)
+    wait(
+        driver, 
+        delay=loading_page_delay, 
+        condition=expected_conditions.presence_of_element_located((By.CLASS_NAME, "filtr_container")), 
+        **wait_args,
+    )
 
     # filtering
-    filter_results(driver, **filter_args)
-    time.sleep(loading_results_delay)
+    old_essay_block = get_first_essay_block(driver)
+    filter_results(driver, **wait_args, **filter_args)
+    wait_for_results(driver, old_essay_block=old_essay_block, delay=loading_results_delay, **wait_args)
 
     # found essays
     found_essays_text = driver.find_element(by=By.CLASS_NAME, value="result_item").text
@@ -271,44 +653,102 @@ def parse(
     num_pagination_pages = int(pagination_elements[-2].text)
     print(f"Num pages: {num_pagination_pages}")
     
+    # essays pages are fetched with a pooled session carrying the browser's cookies
+    session = session_from_driver(driver, pool_size=num_fetchers)
+    
+    if http_listing:
+        essays_urls = iterate_essays_urls_http(session=session, url=driver.current_url)
+        driver.quit()
+    else:
+        essays_urls = iterate_essays_urls(driver, loading_page_delay=loading_page_delay, **wait_args)
+    
     # parsing
-    essays = []
-    stop = False
-    page = 1
-    while not stop:
-        print(f"Parsing {page} page")
-        pagination_essays = get_essays(driver)
-        essays.extend(pagination_essays)
+    essays, failures = [], Counter()
+    if pipeline:
+        # the browser pages through results on the pipeline's listing thread only, 
+        # fetching threads get essays with the session, processes extract them
+        fetch_func = partial(fetch, session=session, cache=cache, refresh=refresh_cache, raise_for_status=True)
+        extract_func = partial(extract_essay_info, parser=PARSER, backend=backend)
         
-        pagination_block = driver.find_element(by=By.CLASS_NAME, value="pagination")
-        pagination_elements = pagination_block.find_elements(by=By.TAG_NAME, value="li")
-        next_page_button_element = pagination_elements[-1]
-
-        if next_page_button_element.get_attribute("class") != "next disabled":
-            next_page_button = next_page_button_element.find_element(by=By.TAG_NAME, value="a")
-            driver.execute_script("arguments[0].click();", next_page_button)
-        else:
-            stop = True
-
-        page += 1
-
-        time.sleep(loading_page_delay)
+        with FetchExtractPipeline(
+            fetch_func=fetch_func, 
+            extract_func=extract_func, 
+            num_fetchers=num_fetchers, 
+            num_extractors=num_extractors,
+        ) as essays_pipeline:
+            for essay_url, essay in tqdm(essays_pipeline.run(essays_urls)):
+                if essay is not None:
+                    essays.append(essay)
+                else:
+                    failures["failed"] += 1
+    elif concurrent:
+        essays, failures = get_essays_concurrently(
+            essays_urls=essays_urls, 
+            session=session, 
+            max_workers=num_fetchers, 
+            cache=cache, 
+            refresh=refresh_cache, 
+            backend=backend,
+        )
+    else:
+        for essay_url in tqdm(essays_urls):
+            try:
+                essay = get_essay(url=essay_url, session=session, cache=cache, refresh=refresh_cache, backend=backend)
+            except Exception as exception:
+                failures[get_failure_type(exception)] += 1
+                continue
+            
+            essays.append(essay)
+    
+    if len(failures) > 0:
+        print(f"Failed to parse {sum(failures.values())} essays: {dict(failures)}")
 
-    driver.close()
+    if not http_listing:
+        driver.quit()
+    
+    session.close()
 
     essays_data_frame = pd.DataFrame.from_dict(essays)
-    essays_data_frame.to_csv(args.output_path, index=False)
+    write_table(essays_data_frame, output_path, partition_columns=partition_columns, schema=STUDENTSHARE_SCHEMA)
     display(essays_data_frame)
 
     num_essays = len(essays)
     print(f"{num_essays} essays were saved to '{output_path}'")
 
+def replay_cache(
+    cache_path: str, 
+    output_path: str = "studentshare_essays.csv", 
+    parser: str = PARSER, 
+    backend: str = "bs4",
+) -> None:
+    """
+    Extracts essays from the cached raw pages only, without a browser or any requests.
+    """
+    
+    cache = PageCache(path=cache_path)
+    
+    essays = []
+    for url, html in tqdm(cache.items(), total=len(cache)):
+        try:
+            essay = extract_essay_info(html=html, url=url, parser=parser, backend=backend)
+        except Exception:
+            continue
+        
+        essays.append(essay)
+        
+    cache.close()
+    
+    essays_data_frame = pd.DataFrame.from_dict(essays)
+    write_table(essays_data_frame, output_path, schema=STUDENTSHARE_SCHEMA)
+    print(f"{len(essays)} essays were extracted from '{cache_path}' and saved to '{output_path}'")
+
+
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("--url", required=True)
-    parser.add_argument("--chrome_driver_path", required=True)
-    parser.add_argument("--email",  required=True)
-    parser.add_argument("--password",  required=True)
+    parser.add_argument("--chrome_driver_path", required=False)
+    parser.add_argument("--email",  required=False)
+    parser.add_argument("--password",  required=False)
     parser.add_argument("--output_path", default="studentshare_essays.csv", required=False)
     parser.add_argument("--document_types", nargs="+", default=None, required=False)
     parser.add_argument("--subjects", nargs="+", default=None, required=False)
@@ -322,8 +762,32 @@ if __name__ == "__main__":
     parser.add_argument("--loading_results_delay", default=10, required=False)
     parser.add_argument("--window_width", default=1980, required=False)
     parser.add_argument("--window_height", default=1280, required=False)
+    parser.add_argument("--cache_path", default=None, required=False)
+    parser.add_argument("--refresh_cache", action="store_true", required=False)
+    parser.add_argument("--replay_cache", action="store_true", required=False)
+    parser.add_argument("--backend", default="bs4", choices=["bs4", "lxml"], required=False)
+    parser.add_argument("--pipeline", action="store_true", required=False)
+    parser.add_argument("--num_fetchers", default=16, type=int, required=False)
+    parser.add_argument("--num_extractors", default=None, type=int, required=False)
+    parser.add_argument("--headless", action="store_true", required=False)
+    parser.add_argument("--explicit_waits", action="store_true", required=False)
+    parser.add_argument("--wait_timeout", default=30.0, type=float, required=False)
+    parser.add_argument("--http_listing", action="store_true", required=False)
+    parser.add_argument("--login_url", default="https://studentshare.org/login", required=False)
+    parser.add_argument("--concurrent", action="store_true", required=False)
+    parser.add_argument("--partition_columns", nargs="+", default=None, required=False)
     
     args = parser.parse_args()
+    
+    if args.replay_cache:
+        if args.cache_path is None:
+            parser.error("`--replay_cache` requires `--cache_path`")
+        
+        replay_cache(cache_path=args.cache_path, output_path=args.output_path, backend=args.backend)
+        exit()
+    
+    if args.chrome_driver_path is None or args.email is None or args.password is None:
+        parser.error("`--chrome_driver_path`, `--email` and `--password` are required")
 
     parse(
         url=args.url,
@@ -343,4 +807,17 @@ if __name__ == "__main__":
         loading_results_delay=args.loading_results_delay,
         window_width=args.window_width,
         window_height=args.window_height,
+        cache_path=args.cache_path,
+        refresh_cache=args.refresh_cache,
+        backend=args.backend,
+        pipeline=args.pipeline,
+        num_fetchers=args.num_fetchers,
+        num_extractors=args.num_extractors,
+        headless=args.headless,
+        explicit_waits=args.explicit_waits,
+        wait_timeout=args.wait_timeout,
+        http_listing=args.http_listing,
+        login_url=args.login_url,
+        concurrent=args.concurrent,
+        partition_columns=args.partition_columns,
     )
\ No newline at end of file
@@ -0,0 +1,334 @@
+from multiprocessing import Pool
+from typing import List, Optional, Iterable, Tuple, Dict
+from argparse import ArgumentParser
+import pandas as pd
+import numpy as np
+import sqlite3
+import zlib
+import re
+
+from storage import read_table, write_table
+
+
+# hashes of shingles are 32-bit, so `a * hash + b` never overflows uint64
+PRIME = (1 << 31) - 1
+
+
+def get_shingles_hashes(text: str, ngram_size: int = 5) -> np.ndarray:
+    words = re.findall(r"\w+", str(text).lower())
+    ngrams = [" ".join(words[index:index + ngram_size]) for index in range(max(len(words) - ngram_size + 1, 1))]
+    hashes = np.fromiter((zlib.crc32(ngram.encode("utf-8")) for ngram in ngrams), dtype=np.uint64, count=len(ngrams))
+    
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """
+    MinHash signatures of word n-gram shingles, the share of equal signature values
+    estimates Jaccard similarity of texts' shingles.
+    """
+    
+    def __init__(self, num_permutations: int = 128, ngram_size: int = 5, seed: int = 42) -> None:
+        self.num_permutations = num_permutations
+        self.ngram_size = ngram_size
+        
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, size=(num_permutations, 1), dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, size=(num_permutations, 1), dtype=np.uint64)
+    
+    def signature(self, text: str) -> np.ndarray:
+        hashes = get_shingles_hashes(text, ngram_size=self.ngram_size)
+        permuted_hashes = (self.a * hashes[None, :] + self.b) % PRIME
+        
+        return permuted_hashes.min(axis=1).astype(np.uint32)
+    
+    def batch_signatures(self, texts: List[str]) -> np.ndarray:
+        signatures = np.empty(shape=(len(texts), self.num_permutations), dtype=np.uint32)
+        for index, text in enumerate(texts):
+            signatures[index] = self.signature(text)
+        
+        return signatures
+    
+    def signatures(self, texts: Iterable[str], num_workers: int = 1, chunk_size: int = 256) -> np.ndarray:
+        texts = list(texts)
+        if num_workers <= 1:
+            return self.batch_signatures(texts)
+        
+        chunks = (texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size))
+        with Pool(processes=num_workers) as pool:
+            signatures = list(pool.imap(self.batch_signatures, chunks))
+        
+        if len(signatures) == 0:
+            return np.empty(shape=(0, self.num_permutations), dtype=np.uint32)
+        
+        return np.concatenate(signatures)
+
+
+def get_bands(signatures: np.ndarray, num_bands: int = 16) -> np.ndarray:
+    """
+    LSH buckets of signatures split into `num_bands` bands, texts sharing a bucket in any band are candidates.
+    With `r` rows per band the pairs of Jaccard similarity around `(1 / num_bands) ** (1 / r)` become candidates.
+    """
+    
+    num_texts, num_permutations = signatures.shape
+    if num_permutations % num_bands != 0:
+        raise ValueError(f"Number of permutations ({num_permutations}) must be divisible by number of bands ({num_bands})")
+    
+    bands = signatures.reshape(num_texts, num_bands, -1).astype(np.uint64)
+    multipliers = np.random.default_rng(0).integers(1, 1 << 62, size=bands.shape[-1], dtype=np.uint64) | np.uint64(1)
+    
+    # overflow is a part of the hash
+    with np.errstate(over="ignore"):
+        buckets = (bands * multipliers).sum(axis=-1, dtype=np.uint64)
+    
+    return buckets
+
+
+def get_similarities(signatures: np.ndarray, other_signatures: np.ndarray) -> np.ndarray:
+    return (signatures == other_signatures).mean(axis=-1)
+
+
+def get_candidate_pairs(buckets: np.ndarray, max_bucket_size: int = 64) -> np.ndarray:
+    """
+    Pairs of texts sharing a bucket. Members of oversized buckets (usually exact duplicates)
+    are paired only with the bucket's first text.
+    """
+    
+    pairs = []
+    for band_buckets in buckets.T:
+        order = np.argsort(band_buckets, kind="stable")
+        sorted_buckets = band_buckets[order]
+        starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        
+        for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            members = order[start:end]
+            if len(members) <= max_bucket_size:
+                first, second = np.triu_indices(len(members), k=1)
+                pairs.append(np.stack([members[first], members[second]], axis=1))
+            else:
+                pairs.append(np.stack([np.full(len(members) - 1, members[0]), members[1:]], axis=1))
+    
+    if len(pairs) == 0:
+        return np.empty(shape=(0, 2), dtype=np.int64)
+    
+    return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+
+def find_near_duplicates_clusters(
+    signatures: np.ndarray,
+    num_bands: int = 16,
+    threshold: float = 0.8,
+    max_bucket_size: int = 64,
+) -> np.ndarray:
+    """
+    Labels of near-duplicates clusters, the label is the index of the cluster's first text.
+    Only candidate pairs from LSH buckets are compared, so it is far from quadratic for real corpora.
+    """
+    
+    pairs = get_candidate_pairs(get_bands(signatures, num_bands=num_bands), max_bucket_size=max_bucket_size)
+    pairs = pairs[get_similarities(signatures[pairs[:, 0]], signatures[pairs[:, 1]]) >= threshold]
+    
+    # union-find, roots are the smallest indexes
+    parents = np.arange(len(signatures))
+    
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        
+        return index
+    
+    for first, second in pairs:
+        first_root, second_root = find(first), find(second)
+        if first_root != second_root:
+            parents[max(first_root, second_root)] = min(first_root, second_root)
+    
+    return np.array([find(index) for index in range(len(signatures))], dtype=np.int64)
+
+
+class SignatureIndex:
+    """
+    Persistent SQLite index of MinHash signatures and their LSH buckets,
+    so new batches are checked against everything indexed before without recomputing it.
+    """
+    
+    def __init__(
+        self,
+        path: str = "signatures.sqlite",
+        num_permutations: int = 128,
+        num_bands: int = 16,
+        ngram_size: int = 5,
+        seed: int = 42,
+    ) -> None:
+        self.path = path
+        self.num_bands = num_bands
+        self.minhasher = MinHasher(num_permutations=num_permutations, ngram_size=ngram_size, seed=seed)
+        
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS signatures (key TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, key TEXT NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS buckets_band_bucket ON buckets (band, bucket)")
+        self.connection.commit()
+        
+        self.check_settings(num_permutations=num_permutations, num_bands=num_bands, ngram_size=ngram_size, seed=seed)
+    
+    def check_settings(self, **settings) -> None:
+        for name, value in settings.items():
+            row = self.connection.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                self.connection.execute("INSERT INTO settings (name, value) VALUES (?, ?)", (name, value))
+            elif row[0] != value:
+                raise ValueError(f"Index '{self.path}' was built with {name}={row[0]}, but given {name}={value}")
+        
+        self.connection.commit()
+    
+    def contains(self, keys: Iterable[str]) -> np.ndarray:
+        return np.array([
+            self.connection.execute("SELECT 1 FROM signatures WHERE key = ?", (key,)).fetchone() is not None
+            for key in keys
+        ], dtype=bool)
+    
+    def add(self, keys: List[str], signatures: np.ndarray) -> None:
+        buckets = get_bands(signatures, num_bands=self.num_bands).view(np.int64)
+        
+        keys = list(keys)
+        self.connection.executemany("DELETE FROM buckets WHERE key = ?", ((key,) for key in keys))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO signatures (key, signature) VALUES (?, ?)",
+            ((key, signature.tobytes()) for key, signature in zip(keys, signatures)),
+        )
+        self.connection.executemany(
+            "INSERT INTO buckets (band, bucket, key) VALUES (?, ?, ?)",
+            (
+                (band, int(bucket), key)
+                for key, key_buckets in zip(keys, buckets)
+                for band, bucket in enumerate(key_buckets)
+            ),
+        )
+        self.connection.commit()
+    
+    def query(self, signatures: np.ndarray, threshold: float = 0.8) -> List[Dict[str, float]]:
+        """
+        Indexed keys similar to each of signatures with their estimated Jaccard similarities.
+        """
+        
+        buckets = get_bands(signatures, num_bands=self.num_bands).view(np.int64)
+        
+        matches = []
+        for signature, signature_buckets in zip(signatures, buckets):
+            candidates = {}
+            for band, bucket in enumerate(signature_buckets):
+                rows = self.connection.execute(
+                    "SELECT s.key, s.signature FROM buckets b JOIN signatures s ON s.key = b.key WHERE b.band = ? AND b.bucket = ?",
+                    (band, int(bucket)),
+                )
+                candidates.update(rows)
+            
+            signature_matches = {}
+            for key, candidate_signature in candidates.items():
+                similarity = get_similarities(signature, np.frombuffer(candidate_signature, dtype=np.uint32))
+                if similarity >= threshold:
+                    signature_matches[key] = float(similarity)
+            
+            matches.append(signature_matches)
+        
+        return matches
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+
+def near_duplicates_selection(
+    data_frame: pd.DataFrame,
+    text_column: str = "full_text",
+    key_column: Optional[str] = None,
+    index: Optional[SignatureIndex] = None,
+    threshold: float = 0.8,
+    num_workers: int = 1,
+    update_index: bool = False,
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Keeps the first text of every near-duplicates cluster and drops texts similar to the ones in `index`,
+    e.g. `train.csv` or previously scraped batches. Kept texts are added to the index with `update_index`.
+    A text never matches its own key, so texts kept by a previous run over a grown file stay selected.
+    Returns selected data frame and clusters labels of all texts.
+    """
+    
+    index = index if index is not None else SignatureIndex(path=":memory:")
+    keys = data_frame[key_column].astype(str).values if key_column is not None else data_frame.index.astype(str).values
+    
+    signatures = index.minhasher.signatures(data_frame[text_column].values, num_workers=num_workers)
+    labels = find_near_duplicates_clusters(signatures, num_bands=index.num_bands, threshold=threshold)
+    
+    selected_mask = labels == np.arange(len(labels))
+    if len(index) > 0:
+        selected_indexes = np.flatnonzero(selected_mask)
+        matches = index.query(signatures[selected_indexes], threshold=threshold)
+        selected_mask[selected_indexes] = np.array([
+            len(match.keys() - {key}) == 0 for key, match in zip(keys[selected_indexes], matches)
+        ], dtype=bool)
+    
+    if update_index:
+        index.add(list(keys[selected_mask]), signatures[selected_mask])
+    
+    return data_frame[selected_mask], labels
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--data_frame_path", required=True)
+    parser.add_argument("--output_path", required=True)
+    parser.add_argument("--text_column", required=False, default="text")
+    parser.add_argument("--key_column", required=False, default="url")
+    parser.add_argument("--reference_path", required=False, default=None)
+    parser.add_argument("--reference_text_column", required=False, default="full_text")
+    parser.add_argument("--reference_key_column", required=False, default="text_id")
+    parser.add_argument("--index_path", required=False, default="signatures.sqlite")
+    parser.add_argument("--threshold", required=False, default=0.8, type=float)
+    parser.add_argument("--num_permutations", required=False, default=128, type=int)
+    parser.add_argument("--num_bands", required=False, default=16, type=int)
+    parser.add_argument("--ngram_size", required=False, default=5, type=int)
+    parser.add_argument("--num_workers", required=False, default=1, type=int)
+    
+    args = parser.parse_args()
+    
+    index = SignatureIndex(
+        path=args.index_path,
+        num_permutations=args.num_permutations,
+        num_bands=args.num_bands,
+        ngram_size=args.ngram_size,
+    )
+    
+    # reference texts, e.g. `train.csv`, are indexed once
+    if args.reference_path is not None:
+        reference_data_frame = read_table(args.reference_path, columns=[args.reference_key_column, args.reference_text_column])
+        reference_keys = reference_data_frame[args.reference_key_column].astype(str).values
+        new_mask = ~index.contains(reference_keys)
+        
+        reference_signatures = index.minhasher.signatures(
+            reference_data_frame[args.reference_text_column].values[new_mask],
+            num_workers=args.num_workers,
+        )
+        index.add(list(reference_keys[new_mask]), reference_signatures)
+        print(f"{new_mask.sum()} texts of '{args.reference_path}' were indexed")
+    
+    data_frame = read_table(args.data_frame_path)
+    selected_data_frame, labels = near_duplicates_selection(
+        data_frame=data_frame,
+        text_column=args.text_column,
+        key_column=args.key_column,
+        index=index,
+        threshold=args.threshold,
+        num_workers=args.num_workers,
+        update_index=True,
+    )
+    write_table(selected_data_frame, args.output_path)
+    
+    print(f"{len(selected_data_frame)} of {len(data_frame)} texts were saved to '{args.output_path}', {len(index)} texts are indexed")
+    
+    index.close()
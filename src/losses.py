@@ -1,18 +1,29 @@
 import torch
+from torch import nn
 from typing import Optional, Tuple, Union
 
 
+def get_normalized_sample_weight(sample_weight: torch.Tensor, dim: int = 0) -> torch.Tensor:
+    # weights are normalized before multiplying, so large weights and batches do not overflow the sum
+    if sample_weight.dim() == 1:
+        sample_weight = sample_weight.unsqueeze(-1)
+    
+    return sample_weight / torch.sum(sample_weight, dim=dim, keepdim=True)
+
+
 def column_wise_rmse_loss(
     input: torch.Tensor, 
     target: torch.Tensor, 
     return_column_wise: bool = False, 
     reduction: str = "mean", 
     column_weight: Optional[torch.Tensor] = None, 
-    sample_weight: Optional[torch.Tenosr] = None,
+    sample_weight: Optional[torch.Tensor] = None,
     ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
     """
     Mean Column-wise Root Mean Squared Error
     https://www.kaggle.com/competitions/feedback-prize-english-language-learning/discussion/348985
+    
+    With `sample_weight` the column-wise MSE is the weighted mean, i.e. normalized by the sum of weights.
     """
     
     # compute column-wise RMSE
@@ -20,9 +31,10 @@ def column_wise_rmse_loss(
     
     # sample weightning
     if sample_weight is not None:
-        squared_error = (squared_error * sample_weight)
+        column_wise_mse = torch.sum(squared_error * get_normalized_sample_weight(sample_weight), dim=0)
+    else:
+        column_wise_mse = torch.mean(squared_error, dim=0)
     
-    column_wise_mse = torch.mean(squared_error, dim=0)
     column_wise_rmse = torch.sqrt(column_wise_mse)
     
     # column weightning
@@ -33,11 +45,96 @@ def column_wise_rmse_loss(
     if reduction == "mean":
         loss = torch.mean(column_wise_rmse, dim=0)
     elif reduction == "max":
-        loss = torch.max(column_wise_rmse, dim=0)
+        loss = torch.amax(column_wise_rmse, dim=0)
     else:
         loss = column_wise_rmse
         
     if return_column_wise:
         return loss, column_wise_rmse
     
-    return loss
\ No newline at end of file
+    return loss
+
+
+def fused_column_wise_rmse_loss(
+    input: torch.Tensor, 
+    target: torch.Tensor, 
+    column_weight: Optional[torch.Tensor] = None, 
+    sample_weight: Optional[torch.Tensor] = None,
+    reduction: str = "mean",
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Same as `column_wise_rmse_loss` with fewer batch-sized intermediates: the error and its square, 
+    per-sample weights are applied by a matrix-vector product instead of a weighted copy of squared errors.
+    Returns loss and column-wise RMSE, can be compiled with `torch.jit.script`.
+    """
+    
+    error = input - target
+    squared_error = error * error
+    
+    if sample_weight is None:
+        column_wise_mse = torch.mean(squared_error, dim=0)
+    elif sample_weight.dim() == 1:
+        column_wise_mse = torch.matmul(sample_weight / torch.sum(sample_weight), squared_error)
+    else:
+        column_wise_mse = torch.sum(squared_error * get_normalized_sample_weight(sample_weight), dim=0)
+    
+    column_wise_rmse = torch.sqrt(column_wise_mse)
+    
+    if column_weight is not None:
+        column_wise_rmse = column_wise_rmse * column_weight
+    
+    if reduction == "mean":
+        loss = torch.mean(column_wise_rmse, dim=0)
+    elif reduction == "max":
+        loss = torch.amax(column_wise_rmse, dim=0)
+    else:
+        loss = column_wise_rmse
+    
+    return loss, column_wise_rmse
+
+
+class ColumnWiseRMSELoss(nn.Module):
+    """
+    Module version of `column_wise_rmse_loss` with `column_weight` kept as a buffer 
+    (moved with the module to the device) and optionally TorchScript-compiled implementation.
+    """
+    
+    def __init__(
+        self, 
+        column_weight: Optional[torch.Tensor] = None, 
+        reduction: str = "mean", 
+        return_column_wise: bool = False, 
+        script: bool = False,
+    ) -> None:
+        super().__init__()
+        
+        if reduction not in ("mean", "max", "none"):
+            raise ValueError(f"Unsupported reduction '{reduction}', expected one of 'mean', 'max', 'none'")
+        
+        self.reduction = reduction
+        self.return_column_wise = return_column_wise
+        self.loss_function = torch.jit.script(fused_column_wise_rmse_loss) if script else fused_column_wise_rmse_loss
+        
+        if column_weight is not None:
+            column_weight = torch.as_tensor(column_weight, dtype=torch.float32)
+        
+        self.register_buffer("column_weight", column_weight)
+    
+    def forward(
+        self, 
+        input: torch.Tensor, 
+        target: torch.Tensor, 
+        sample_weight: Optional[torch.Tensor] = None,
+    ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        loss, column_wise_rmse = self.loss_function(
+            input, 
+            target, 
+            column_weight=self.column_weight, 
+            sample_weight=sample_weight, 
+            reduction=self.reduction,
+        )
+        
+        if self.return_column_wise:
+            return loss, column_wise_rmse
+        
+        return loss
@@ -0,0 +1,201 @@
+from typing import List, Optional, Iterator, Dict, Any, Callable
+import pandas as pd
+import glob
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".feather", ".arrow")
+
+
+def check_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet/Arrow storage requires pyarrow, install it with `pip install pyarrow`")
+
+
+def get_format(path: str) -> str:
+    """
+    Storage format by path: '.csv' files, '.feather'/'.arrow' files, 
+    '.parquet' files or directories of partitioned Parquet files.
+    """
+    
+    extension = os.path.splitext(path.rstrip("/"))[1].lower()
+    
+    if extension in PARQUET_EXTENSIONS or (extension == "" and os.path.isdir(path)):
+        return "parquet"
+    elif extension in ARROW_EXTENSIONS:
+        return "arrow"
+    
+    return "csv"
+
+
+def write_table(
+    data_frame: pd.DataFrame, 
+    path: str, 
+    partition_columns: Optional[List[str]] = None, 
+    row_group_size: Optional[int] = None,
+    schema: Optional["pa.Schema"] = None,
+) -> None:
+    """
+    Writes data frame in the format given by `path`, Parquet output can be partitioned by `partition_columns`.
+    Parquet/Arrow columns are typed by `schema` (e.g. list-valued `subject`), otherwise types are inferred.
+    """
+    
+    storage_format = get_format(path)
+    
+    # partitioned output is a directory of Parquet files, which may not exist yet
+    if partition_columns is not None:
+        if storage_format != "parquet" and os.path.splitext(path.rstrip("/"))[1] != "":
+            raise ValueError(f"Partitioned output must be a Parquet directory, but given '{path}'")
+        
+        storage_format = "parquet"
+    
+    if storage_format == "csv":
+        data_frame.to_csv(path, index=False)
+        return
+    
+    check_pyarrow()
+    if schema is not None and len(data_frame) == 0:
+        table = schema.empty_table()
+    else:
+        table = pa.Table.from_pandas(data_frame, schema=schema, preserve_index=False)
+    
+    if storage_format == "arrow":
+        feather.write_feather(table, path)
+    elif partition_columns is not None:
+        pq.write_to_dataset(table, root_path=path, partition_cols=partition_columns)
+    else:
+        pq.write_table(table, path, row_group_size=row_group_size)
+        
+
+def read_table(
+    path: str, 
+    columns: Optional[List[str]] = None, 
+    filters: Optional[List[Any]] = None, 
+    memory_map: bool = True,
+) -> pd.DataFrame:
+    """
+    Reads only `columns` of the table, Parquet and Arrow files are memory-mapped 
+    and other columns are not parsed at all.
+    """
+    
+    storage_format = get_format(path)
+    
+    if storage_format == "csv":
+        return pd.read_csv(path, usecols=columns)
+    
+    check_pyarrow()
+    
+    if storage_format == "arrow":
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=memory_map)
+        
+    return table.to_pandas()
+
+
+def iterate_table_chunks(
+    path: str, 
+    chunk_size: int = 10000, 
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields chunks of at most `chunk_size` rows, partition columns of Hive-partitioned directories included.
+    """
+    
+    storage_format = get_format(path)
+    
+    if storage_format == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+        return
+    
+    check_pyarrow()
+    
+    if storage_format == "arrow":
+        dataset = ds.dataset(path, format="feather")
+    else:
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+def get_parts_paths(path: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+
+
+def check_appendable(path: str) -> None:
+    storage_format = get_format(path)
+    
+    if storage_format not in ("csv", "parquet"):
+        raise ValueError(f"Appending is supported only for CSV files and Parquet directories, but given '{path}'")
+    
+    if storage_format == "parquet":
+        check_pyarrow()
+            
+
+def append_table(data_frame: pd.DataFrame, path: str, schema: Optional["pa.Schema"] = None) -> None:
+    """
+    Appends rows to CSV file, or adds them as a new part file of Parquet directory.
+    """
+    
+    check_appendable(path)
+    storage_format = get_format(path)
+    
+    if storage_format == "csv":
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, mode="a", encoding="utf-8", newline="") as file:
+            data_frame.to_csv(file, header=write_header, index=False)
+            file.flush()
+            os.fsync(file.fileno())
+    elif storage_format == "parquet":
+        os.makedirs(path, exist_ok=True)
+        part_path = os.path.join(path, f"part-{len(get_parts_paths(path)):05d}.parquet")
+        write_table(data_frame, part_path, schema=schema)
+
+
+class ParquetPartsWriter:
+    """
+    Buffers rows and writes them as rotating Parquet part files of `rows_per_part` rows into `path` directory.
+    `on_flush` is called with the rows once they are written.
+    """
+    
+    def __init__(
+        self, 
+        path: str, 
+        rows_per_part: int = 1000, 
+        on_flush: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        schema: Optional["pa.Schema"] = None,
+    ) -> None:
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self.on_flush = on_flush
+        self.schema = schema
+        self.rows = []
+        
+    def write(self, row: Dict[str, Any]) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.rows_per_part:
+            self.flush()
+            
+    def flush(self) -> None:
+        if len(self.rows) == 0:
+            return
+        
+        append_table(pd.DataFrame.from_dict(self.rows), self.path, schema=self.schema)
+        
+        if self.on_flush is not None:
+            self.on_flush(self.rows)
+            
+        self.rows = []
+        
+    def close(self) -> None:
+        self.flush()
@@ -1,13 +1,13 @@
 from transform import Transform
+from utils import compile_keys_pattern
 from typing import Optional, Dict
 import requests
 import json
-import random
 
 
 class AccentConverter(Transform):
-    def __init__(self, accent_dict: Optional[Dict[str, str]] = None, p: float = 0.5):
-        super().__init__(p)
+    def __init__(self, accent_dict: Optional[Dict[str, str]] = None, p: float = 0.5, seed: Optional[int] = None):
+        super().__init__(p, seed)
         
         self.accent_dict = accent_dict
         
@@ -17,12 +17,21 @@ class AccentConverter(Transform):
             self.accent_dict = json.loads(response.text)
             
         self.reversed_accent_dict = {v:k for k, v in self.accent_dict.items()}
+        
+        # one compiled matcher per direction, so each text is rewritten in a single pass
+        self.accent_pattern = compile_keys_pattern(self.accent_dict.keys())
+        self.reversed_accent_pattern = compile_keys_pattern(self.reversed_accent_dict.keys())
             
     def transform(self, text: str) -> str:
-        dict_index = random.randint(a=0, b=1)
-        accent_dict = self.accent_dict if bool(dict_index) else self.reversed_accent_dict
+        dict_index = self.rng.integers(2)
+        if bool(dict_index):
+            accent_dict, accent_pattern = self.accent_dict, self.accent_pattern
+        else:
+            accent_dict, accent_pattern = self.reversed_accent_dict, self.reversed_accent_pattern
+        
+        if accent_pattern is None:
+            return text
         
-        for k, v in accent_dict.items():
-            text = text.replace(k, v)
+        text = accent_pattern.sub(lambda match: accent_dict[match.group(0)], text)
             
         return text
\ No newline at end of file
@@ -0,0 +1,204 @@
+from utils import join_text_parts
+from translation_cache import TranslationCache
+from nltk.tokenize import sent_tokenize
+from typing import List, Optional, Callable, Awaitable, Tuple, Type, Any
+from functools import partial
+from tqdm import tqdm
+import asyncio
+import random
+import time
+
+
+class AsyncTranslator:
+    """
+    Interface of translators used by the asynchronous back-translation engine.
+    """
+    
+    async def translate(self, text: str, source_language: str, target_language: str) -> str:
+        raise NotImplementedError
+
+
+class SyncTranslatorAdapter(AsyncTranslator):
+    """
+    Runs blocking `translate_func(text, source_language, target_language)` in the default thread pool.
+    """
+    
+    def __init__(self, translate_func: Callable[..., str]) -> None:
+        self.translate_func = translate_func
+        
+    async def translate(self, text: str, source_language: str, target_language: str) -> str:
+        loop = asyncio.get_running_loop()
+        func = partial(
+            self.translate_func, 
+            text=text, 
+            source_language=source_language, 
+            target_language=target_language,
+        )
+        
+        return await loop.run_in_executor(None, func)
+
+
+class StubTranslator(AsyncTranslator):
+    """
+    Offline translator returning texts unchanged after `latency` seconds, 
+    fails with probability `failure_rate` to exercise retries.
+    """
+    
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.num_calls = 0
+        
+    async def translate(self, text: str, source_language: str, target_language: str) -> str:
+        self.num_calls += 1
+        await asyncio.sleep(self.latency)
+        
+        if self.random.random() < self.failure_rate:
+            raise ConnectionError("Stub translator failure")
+        
+        return text
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` requests per second with bursts up to `capacity` requests.
+    Must be created inside the running event loop.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        
+        if self.rate <= 0:
+            raise ValueError(f"`rate` must be positive, but given {self.rate}")
+        
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+async def call_with_retries(
+    func: Callable[[], Awaitable[Any]], 
+    max_retries: int = 5, 
+    backoff: float = 1.0, 
+    max_backoff: float = 60.0,
+    retry_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+) -> Any:
+    """
+    Calls `func` retrying failures with exponential backoff and jitter.
+    """
+    
+    for attempt in range(max_retries + 1):
+        try:
+            return await func()
+        except retry_exceptions:
+            if attempt == max_retries:
+                raise
+            
+            delay = min(max_backoff, backoff * 2 ** attempt)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+
+class AsyncBackTranslation:
+    def __init__(
+        self, 
+        translator: AsyncTranslator, 
+        source_language: str = "en", 
+        target_language: str = "fr", 
+        max_length: int = 5000,
+        max_concurrency: int = 8,
+        requests_per_second: float = 2.0,
+        burst: Optional[float] = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        split_func: Callable[[str], List[str]] = sent_tokenize,
+        cache: Optional[TranslationCache] = None,
+    ) -> None:
+        self.translator = translator
+        self.source_language = source_language
+        self.target_language = target_language
+        self.max_length = max_length
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.split_func = split_func
+        self.cache = cache
+        
+        # created for every run inside its event loop
+        self.semaphore = None
+        self.rate_limiter = None
+        
+    async def translate_segment(self, text: str, source_language: str, target_language: str) -> str:
+        if self.cache is not None:
+            translated_text = self.cache.get(text, source_language, target_language)
+            if translated_text is not None:
+                return translated_text
+        
+        async def request() -> str:
+            await self.rate_limiter.acquire()
+            return await self.translator.translate(text, source_language, target_language)
+        
+        async with self.semaphore:
+            translated_text = await call_with_retries(request, max_retries=self.max_retries, backoff=self.backoff)
+            
+        if self.cache is not None:
+            self.cache.set(text, source_language, target_language, translated_text)
+        
+        return translated_text
+        
+    async def translate(self, text: str, source_language: str, target_language: str) -> str:
+        if len(text) < self.max_length:
+            return await self.translate_segment(text, source_language, target_language)
+        
+        segments = self.split_func(text)
+        translated_segments = await asyncio.gather(*[
+            self.translate_segment(segment, source_language, target_language) for segment in segments
+        ])
+        
+        return join_text_parts(translated_segments)
+    
+    async def back_translate(self, text: str) -> str:
+        translated_text = await self.translate(text, self.source_language, self.target_language)
+        back_translated_text = await self.translate(translated_text, self.target_language, self.source_language)
+        
+        return back_translated_text
+    
+    async def back_translate_many(self, texts: List[str], verbose: bool = True) -> List[str]:
+        """
+        Back-translates all texts concurrently: the backward leg of one essay overlaps with 
+        the forward legs of others, while in-flight requests are bounded by `max_concurrency`.
+        """
+        
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.rate_limiter = TokenBucket(rate=self.requests_per_second, capacity=self.burst)
+        
+        progress_bar = tqdm(total=len(texts), disable=not verbose)
+        
+        async def back_translate_text(text: str) -> str:
+            back_translated_text = await self.back_translate(text)
+            progress_bar.update(1)
+            
+            return back_translated_text
+        
+        back_translated_texts = await asyncio.gather(*[back_translate_text(text) for text in texts])
+        progress_bar.close()
+        
+        return list(back_translated_texts)
+    
+    def __call__(self, texts: List[str], verbose: bool = True) -> List[str]:
+        return asyncio.run(self.back_translate_many(list(texts), verbose=verbose))
@@ -1,13 +1,106 @@
 from transform import Transform
-from typing import List, Union
+from executor import parallel_apply
+from utils import join_text_parts
+from nltk.tokenize import word_tokenize
+from typing import List, Union, Optional
+from collections.abc import Iterable
+from tqdm import tqdm
+import numpy as np
 
 
 class Compose:
-    def __init__(self, transforms: List[Transform]) -> None:
+    def __init__(
+        self, 
+        transforms: List[Transform], 
+        num_workers: int = 1, 
+        shard_size: int = 256, 
+        fused: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
         self.transforms = transforms
+        self.num_workers = num_workers
+        self.shard_size = shard_size
+        self.fused = fused
+        self.rng = np.random.default_rng(seed)
+        
+    def fused_apply_batch(self, texts: List[str]) -> List[str]:
+        """
+        Consecutive token-level transforms share one word tokenization,
+        text is detokenized only before a text-level transform and at the end.
+        """
+        
+        texts = list(texts)
+        apply_masks = [transform.get_apply_mask(len(texts), transform.rng) for transform in self.transforms]
+        
+        for index, text in enumerate(texts):
+            tokens = None
+            for transform, apply_mask in zip(self.transforms, apply_masks):
+                if not apply_mask[index]:
+                    continue
+                    
+                if transform.token_level:
+                    if tokens is None:
+                        tokens = word_tokenize(text)
+                    tokens = transform.transform_tokens(tokens)
+                else:
+                    if tokens is not None:
+                        text = join_text_parts(tokens)
+                        tokens = None
+                    text = transform.transform(text)
+            
+            if tokens is not None:
+                text = join_text_parts(tokens)
+            
+            texts[index] = text
+            
+        return texts
     
-    def __call__(self, text: Union[str, List[str]]):
+    def apply_transforms(self, texts: List[str]) -> List[str]:
+        if self.fused:
+            return self.fused_apply_batch(texts)
+        
         for transform in self.transforms:
-            text = transform(text)
+            texts = transform.apply_batch(texts)
+            
+        return texts
+    
+    def apply_batch(self, texts: List[str], rng: Optional[np.random.Generator] = None) -> List[str]:
+        """
+        With `rng` transforms draw from generators seeded by it during this call only, 
+        their own generators are restored afterwards.
+        """
+        
+        if rng is None:
+            return self.apply_transforms(texts)
+        
+        transforms_rngs = [transform.rng for transform in self.transforms]
+        try:
+            for transform in self.transforms:
+                transform.rng = np.random.default_rng(rng.integers(2**63))
+            
+            return self.apply_transforms(texts)
+        finally:
+            for transform, transform_rng in zip(self.transforms, transforms_rngs):
+                transform.rng = transform_rng
+    
+    def __call__(self, text: Union[str, List[str]]):
+        if isinstance(text, str):
+            return self.apply_batch([text], rng=self.rng)[0]
+        
+        if not isinstance(text, Iterable):
+            return text
+        
+        if self.num_workers > 1:
+            # fused pipeline is shipped as a whole, otherwise each transform is applied to the shard in turn
+            transforms = [self] if self.fused else self.transforms
+            transformed_text = parallel_apply(
+                transforms=transforms, 
+                texts=text, 
+                num_workers=self.num_workers, 
+                shard_size=self.shard_size, 
+                seed=int(self.rng.integers(2**63)),
+            )
+            
+            return list(tqdm(transformed_text, total=len(text)))
         
-        return text
\ No newline at end of file
+        return self.apply_batch(text, rng=self.rng)
\ No newline at end of file
@@ -1,13 +1,14 @@
 from transform import Transform
 from utils import join_text_parts
+from typing import Optional, List
 from nltk.tokenize import word_tokenize, sent_tokenize
 import numpy as np
 import math
 
 
 class CutOut(Transform):
-    def __init__(self, level: str = "word", fraction: float = 0.01, p: float = 0.5):
-        super().__init__(p)
+    def __init__(self, level: str = "word", fraction: float = 0.01, p: float = 0.5, seed: Optional[int] = None):
+        super().__init__(p, seed)
         
         self.level = level
         self.fraction = fraction
@@ -18,15 +19,57 @@ class CutOut(Transform):
             
         if self.level == "word":
             self.__split_func = word_tokenize
+            self.token_level = True
         elif self.level == "sentence":
             self.__split_func = sent_tokenize
         
     def transform(self, text: str) -> str:
-        segments = np.array(self.__split_func(text))
+        segments = self.__split_func(text)
+        segments = self.cutout(segments)
+        transformed_text = join_text_parts(segments)
+        
+        return transformed_text
+    
+    def transform_tokens(self, tokens: List[str]) -> List[str]:
+        return self.cutout(tokens)
+    
+    def drop_segments(self, segments: List[str], cutout_segments: np.ndarray) -> List[str]:
+        keep_mask = np.ones(len(segments), dtype=bool)
+        keep_mask[cutout_segments] = False
+        
+        return [segment for segment, keep in zip(segments, keep_mask) if keep]
+    
+    def cutout(self, segments: List[str]) -> List[str]:
         num_segments = len(segments)
         num_cutout_segments = math.ceil(num_segments * self.fraction)
-        cutout_segments = np.random.choice(a=range(0, num_segments), size=num_cutout_segments, replace=False)
-        segments = np.delete(segments, cutout_segments)
-        transformed_text = join_text_parts(segments)
+        cutout_segments = self.rng.choice(num_segments, size=num_cutout_segments, replace=False)
+        
+        return self.drop_segments(segments, cutout_segments)
+    
+    def apply_batch(self, texts: List[str], rng: Optional[np.random.Generator] = None) -> List[str]:
+        """
+        Cutout positions of all selected texts are drawn with one call: 
+        each text drops the segments with the smallest random keys in its slice.
+        """
+        
+        if rng is None:
+            rng = self.rng
+        
+        texts = list(texts)
+        indexes = np.flatnonzero(self.get_apply_mask(len(texts), rng))
+        texts_segments = [self.__split_func(texts[index]) for index in indexes]
+        
+        lengths = np.array([len(segments) for segments in texts_segments], dtype=int)
+        offsets = np.cumsum(lengths) - lengths
+        keys = rng.random(lengths.sum())
+        
+        for index, segments, offset, length in zip(indexes, texts_segments, offsets, lengths):
+            num_cutout_segments = min(math.ceil(length * self.fraction), length)
+            if num_cutout_segments > 0:
+                segments_keys = keys[offset:offset + length]
+                cutout_segments = np.argpartition(segments_keys, num_cutout_segments - 1)[:num_cutout_segments]
+                segments = self.drop_segments(segments, cutout_segments)
+            
+            texts[index] = join_text_parts(segments)
         
-        return transformed_text
\ No newline at end of file
+        return texts
\ No newline at end of file
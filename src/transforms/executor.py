@@ -0,0 +1,49 @@
+from multiprocessing import Pool
+from typing import List, Iterator, Iterable, Optional, Tuple, Any
+import numpy as np
+
+
+# transforms of the current worker process, they are sent once by the pool initializer
+_worker_transforms = None
+
+
+def initialize_worker(transforms: List[Any]) -> None:
+    global _worker_transforms
+    _worker_transforms = transforms
+
+
+def apply_shard(shard: Tuple[np.random.SeedSequence, List[str]]) -> List[str]:
+    seed_sequence, texts = shard
+    
+    # every shard has its own stream, so outputs do not depend on which worker takes the shard
+    seed_sequences = seed_sequence.spawn(len(_worker_transforms))
+    for transform, transform_seed_sequence in zip(_worker_transforms, seed_sequences):
+        transform.rng = np.random.default_rng(transform_seed_sequence)
+        texts = transform.apply_batch(texts, rng=transform.rng)
+    
+    return texts
+
+
+def parallel_apply(
+    transforms: List[Any], 
+    texts: Iterable[str], 
+    num_workers: Optional[int] = None, 
+    shard_size: int = 256, 
+    seed: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Applies transforms sequentially to shards of texts in a process pool.
+    Results are yielded in the original order and are reproducible for a given `seed`.
+    """
+    
+    texts = list(texts)
+    shard_starts = range(0, len(texts), shard_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(shard_starts))
+    shards = (
+        (seed_sequence, texts[start:start + shard_size]) 
+        for seed_sequence, start in zip(seed_sequences, shard_starts)
+    )
+    
+    with Pool(processes=num_workers, initializer=initialize_worker, initargs=(transforms,)) as pool:
+        for transformed_texts in pool.imap(apply_shard, shards):
+            yield from transformed_texts
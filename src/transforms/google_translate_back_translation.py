@@ -1,14 +1,26 @@
 from transform import Transform
 from utils import join_text_parts
+from translation_cache import TranslationCache
+from async_back_translation import AsyncBackTranslation, SyncTranslatorAdapter
 from googletrans import Translator
-from typing import List, Union, Optional
-from collections import Iterable
+from typing import List, Union, Optional, Tuple, Set, Callable, Dict
+from collections.abc import Iterable
 from nltk.tokenize import sent_tokenize
 from argparse import ArgumentParser
 from tqdm import tqdm
 import pandas as pd
+import numpy as np
 import nltk
 import time
+import sys
+import re
+import os
+
+if __name__ == "__main__":
+    # the shared storage layer lives in src/
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from storage import read_table, write_table, iterate_table_chunks, append_table, check_appendable
 
 
 nltk.download("punkt")
@@ -24,10 +36,12 @@ class GoogleTranslateBackTranslation(Transform):
         segment_delay: float = 1.0,
         translations_delay: float = 1.0,
         max_length: int = 5000,
+        cache: Optional[TranslationCache] = None,
         p: float = 0.5,
+        seed: Optional[int] = None,
         **translator_args,
     ) -> None:
-        super().__init__(p)    
+        super().__init__(p, seed)    
     
         self.translator = translator
         self.source_language = source_language
@@ -36,7 +50,9 @@ class GoogleTranslateBackTranslation(Transform):
         self.segment_delay = segment_delay
         self.translations_delay = translations_delay
         self.max_length = max_length
+        self.cache = cache
         self.translator_args = translator_args
+        self.num_translator_calls = 0
 
         if self.translator is None:
             self.translator = Translator(**self.translator_args)
@@ -49,25 +65,87 @@ class GoogleTranslateBackTranslation(Transform):
         
     def split_text_into_segments(self, text: str) -> List[str]:        
         return sent_tokenize(text)
+    
+    def split_text_into_segments_and_separators(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        Sentences of every line and the original text around them (one separator more than sentences), 
+        so translated sentences can be put back into the text's own layout, e.g. paragraph breaks.
+        """
+        
+        segments, separators, end = [], [], 0
+        for line in re.finditer(r"[^\n]+", text):
+            line_segments = self.split_text_into_segments(line.group())
+            
+            starts, position = [], line.start()
+            for segment in line_segments:
+                start = text.find(segment, position, line.end())
+                if start < 0:
+                    break
+                starts.append(start)
+                position = start + len(segment)
+            
+            # the tokenizer changed the line, so it is kept as a single segment
+            if len(starts) < len(line_segments):
+                line_segments, starts = [line.group()], [line.start()]
+            
+            for segment, start in zip(line_segments, starts):
+                separators.append(text[end:start])
+                segments.append(segment)
+                end = start + len(segment)
+        
+        separators.append(text[end:])
+        
+        return segments, separators
+        
+    def cached_translate(self, text: str, source_language: str, target_language: str) -> Tuple[str, bool]:
+        """
+        Returns translation and whether it was taken from the cache, the translator is called only on a miss.
+        """
+        
+        if self.cache is not None:
+            translated_text = self.cache.get(text, source_language, target_language)
+            if translated_text is not None:
+                return translated_text, True
+        
+        translated_text = self.translate_func(
+            text=text, 
+            source_language=source_language, 
+            target_language=target_language,
+        )
+        self.num_translator_calls += 1
+        
+        if self.cache is not None:
+            self.cache.set(text, source_language, target_language, translated_text)
+        
+        return translated_text, False
         
     def translate(self, text: str, source_language: str, target_language: str) -> str:        
+        if self.cache is not None:
+            translated_text = self.cache.get(text, source_language, target_language)
+            if translated_text is not None:
+                return translated_text
+        
         text_length = len(text)
         if text_length >= self.max_length:
             translated_text = []
             segments = self.split_text_into_segments(text)
             for segment in segments:
-                translated_segment = self.translate_func(
+                translated_segment, is_cached = self.cached_translate(
                     text=segment, 
                     source_language=source_language, 
                     target_language=target_language,
                 )
                 
                 translated_text.append(translated_segment)
-                time.sleep(self.segment_delay)
+                if not is_cached:
+                    time.sleep(self.segment_delay)
             
             translated_text = join_text_parts(translated_text)
+            
+            if self.cache is not None:
+                self.cache.set(text, source_language, target_language, translated_text)
         else:
-            translated_text = self.translate_func(
+            translated_text, _ = self.cached_translate(
                 text=text, 
                 source_language=source_language, 
                 target_language=target_language,
@@ -76,13 +154,16 @@ class GoogleTranslateBackTranslation(Transform):
         return translated_text
         
     def transform(self, text: str, return_translated_text: bool = False) -> str:
+        num_translator_calls = self.num_translator_calls
         translated_text = self.translate(
             text=text, 
             source_language=self.source_language, 
             target_language=self.target_language,
         )
         
-        time.sleep(self.translations_delay)
+        # no need to wait when translation was taken from the cache
+        if self.num_translator_calls > num_translator_calls:
+            time.sleep(self.translations_delay)
         
         back_translated_text = self.translate(
             text=translated_text, 
@@ -95,6 +176,147 @@ class GoogleTranslateBackTranslation(Transform):
         
         return back_translated_text
     
+    def batch_segments(self, segments: List[str], separator: str = "\n") -> List[List[int]]:
+        """
+        Groups consecutive segments, so that each group joined by `separator` is shorter than `max_length`.
+        Segments containing the separator are always translated alone.
+        """
+        
+        batches, batch, batch_length = [], [], 0
+        for index, segment in enumerate(segments):
+            segment_length = len(segment) + len(separator)
+            is_alone = separator in segment
+            
+            if len(batch) > 0 and (is_alone or batch_length + segment_length > self.max_length):
+                batches.append(batch)
+                batch, batch_length = [], 0
+            
+            batch.append(index)
+            batch_length += segment_length
+            
+            if is_alone:
+                batches.append(batch)
+                batch, batch_length = [], 0
+        
+        if len(batch) > 0:
+            batches.append(batch)
+        
+        return batches
+        
+    def translate_segments(
+        self, 
+        segments: List[str], 
+        source_language: str, 
+        target_language: str, 
+        separator: str = "\n",
+    ) -> List[str]:
+        translated_segments = [None] * len(segments)
+        for batch in self.batch_segments(segments, separator=separator):
+            batch_segments = [segments[index] for index in batch]
+            translated_batch, is_cached = self.cached_translate(
+                text=separator.join(batch_segments), 
+                source_language=source_language, 
+                target_language=target_language,
+            )
+            if not is_cached:
+                time.sleep(self.segment_delay)
+            
+            translated_batch = translated_batch.split(separator)
+            
+            # translator merged or split lines, falling back to segment-wise translation
+            if len(translated_batch) != len(batch):
+                translated_batch = []
+                for segment in batch_segments:
+                    translated_segment, is_cached = self.cached_translate(
+                        text=segment, 
+                        source_language=source_language, 
+                        target_language=target_language,
+                    )
+                    translated_batch.append(translated_segment)
+                    if not is_cached:
+                        time.sleep(self.segment_delay)
+            
+            for index, translated_segment in zip(batch, translated_batch):
+                translated_segments[index] = translated_segment
+        
+        return translated_segments
+    
+    def multi_back_translate(self, texts: List[str], target_languages: List[str]) -> Dict[str, List[str]]:
+        """
+        Back-translates texts through each of `target_languages`. Texts are split into sentences only once 
+        and sentences of each text are packed into requests of up to `max_length` characters. 
+        Requests never mix sentences of different texts, so a translator merging or splitting lines 
+        can't shift sentences from one text to another. Back-translated sentences are put back between 
+        the original separators, so paragraphs are kept as by `transform`.
+        Returns back-translated texts for every target language.
+        """
+        
+        texts = list(texts)
+        indexes = np.flatnonzero(self.get_apply_mask(len(texts), self.rng))
+        texts_segments, texts_separators = [], []
+        for index in indexes:
+            text_segments, text_separators = self.split_text_into_segments_and_separators(texts[index])
+            texts_segments.append(text_segments)
+            texts_separators.append(text_separators)
+        
+        back_translated_texts = {}
+        for target_language in target_languages:
+            translated_texts_segments = [
+                self.translate_segments(
+                    segments=text_segments, 
+                    source_language=self.source_language, 
+                    target_language=target_language,
+                ) 
+                for text_segments in texts_segments
+            ]
+            time.sleep(self.translations_delay)
+            
+            language_texts = list(texts)
+            for index, translated_segments, separators in zip(indexes, translated_texts_segments, texts_separators):
+                back_translated_segments = self.translate_segments(
+                    segments=translated_segments, 
+                    source_language=target_language, 
+                    target_language=self.source_language,
+                )
+                language_texts[index] = "".join(
+                    separator + segment for separator, segment in zip(separators, back_translated_segments)
+                ) + separators[-1]
+            
+            back_translated_texts[target_language] = language_texts
+        
+        return back_translated_texts
+    
+    def async_back_translate(
+        self, 
+        texts: List[str], 
+        max_concurrency: int = 8, 
+        requests_per_second: float = 2.0, 
+        max_retries: int = 5,
+    ) -> List[str]:
+        """
+        Back-translates texts with bounded concurrent requests, token-bucket rate limiting and retries
+        instead of fixed delays. Texts are selected with probability `p` as in `apply`.
+        """
+        
+        engine = AsyncBackTranslation(
+            translator=SyncTranslatorAdapter(self.translate_func), 
+            source_language=self.source_language, 
+            target_language=self.target_language, 
+            max_length=self.max_length, 
+            max_concurrency=max_concurrency, 
+            requests_per_second=requests_per_second, 
+            max_retries=max_retries, 
+            split_func=self.split_text_into_segments, 
+            cache=self.cache,
+        )
+        
+        texts = list(texts)
+        indexes = np.flatnonzero(self.get_apply_mask(len(texts), self.rng))
+        back_translated_texts = engine([texts[index] for index in indexes])
+        for index, back_translated_text in zip(indexes, back_translated_texts):
+            texts[index] = back_translated_text
+        
+        return texts
     
     def __call__(self, text: Union[str, List[str]]) -> Union[str, List[str]]:
         if isinstance(text, str):
@@ -102,28 +324,126 @@ class GoogleTranslateBackTranslation(Transform):
         elif isinstance(text, Iterable):
             transformed_text = []
             for t in tqdm(text, total=len(text)):
+                num_translator_calls = self.num_translator_calls
                 transformed_t = self.apply(t)
                 transformed_text.append(transformed_t)
-                time.sleep(self.delay)
+                if self.num_translator_calls > num_translator_calls:
+                    time.sleep(self.delay)
         else:
             transformed_text = text
         
         return transformed_text
 
 
+def read_processed_ids(path: str, id_column: str) -> Set[str]:
+    """
+    Ids of rows already saved to the output, the output itself is the resume point.
+    """
+    
+    if not os.path.exists(path):
+        return set()
+    
+    processed_ids = set()
+    for chunk in iterate_table_chunks(path, columns=[id_column]):
+        processed_ids.update(chunk[id_column].astype(str))
+    
+    return processed_ids
+
+
+def assign_back_translated_texts(
+    data_frame: pd.DataFrame, 
+    back_translated_texts: Union[List[str], Dict[str, List[str]]], 
+    back_translated_column: str,
+) -> None:
+    """
+    Multi-language back-translations are written into `<back_translated_column>_<language>` columns.
+    """
+    
+    if isinstance(back_translated_texts, dict):
+        for language, language_texts in back_translated_texts.items():
+            data_frame[f"{back_translated_column}_{language}"] = language_texts
+    else:
+        data_frame[back_translated_column] = back_translated_texts
+
+
+def stream_back_translation(
+    back_translate_func: Callable[[List[str]], List[str]], 
+    data_frame_path: str, 
+    output_path: str, 
+    text_column: str = "text", 
+    back_translated_column: str = "back_translated_text", 
+    id_column: str = "text_id", 
+    chunk_size: int = 100,
+    columns: Optional[List[str]] = None,
+) -> None:
+    """
+    Reads (only `columns` of) the data frame in chunks and appends back-translated rows to `output_path` 
+    (CSV file or directory of Parquet parts).
+    A restarted run reads ids of the rows already in `output_path` and skips them, 
+    so rows are neither lost nor appended twice.
+    """
+    
+    check_appendable(output_path)
+    
+    processed_ids = read_processed_ids(output_path, id_column=id_column)
+    if len(processed_ids) > 0:
+        print(f"Resuming '{output_path}', {len(processed_ids)} texts were already back-translated")
+    
+    for chunk in iterate_table_chunks(data_frame_path, chunk_size=chunk_size, columns=columns):
+        chunk = chunk[~chunk[id_column].astype(str).isin(processed_ids)]
+        if len(chunk) == 0:
+            continue
+        
+        chunk = chunk.copy()
+        assign_back_translated_texts(chunk, back_translate_func(chunk[text_column].values), back_translated_column)
+        
+        append_table(chunk, output_path)
+        processed_ids.update(chunk[id_column].astype(str))
+
+
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("--data_frame_path", required=True)
     parser.add_argument("--source_language", required=True)
-    parser.add_argument("--target_language", required=True)
+    parser.add_argument("--target_language", required=False, default=None)
+    parser.add_argument("--target_languages", nargs="+", required=False, default=None)
     parser.add_argument("--output_path", required=True)
     parser.add_argument("--text_column", required=False, default="text")
     parser.add_argument("--back_translated_column", required=False, default="back_translated_text")
     parser.add_argument("--delay", required=False, default=1.0)
     parser.add_argument("--segment_delay", required=False, default=1.0)
     parser.add_argument("--translations_delay", required=False, default=1.0)
+    parser.add_argument("--cache_path", required=False, default=None)
+    parser.add_argument("--cache_max_size", required=False, default=None, type=int)
+    parser.add_argument("--async_mode", required=False, action="store_true")
+    parser.add_argument("--max_concurrency", required=False, default=8, type=int)
+    parser.add_argument("--requests_per_second", required=False, default=2.0, type=float)
+    parser.add_argument("--max_retries", required=False, default=5, type=int)
+    parser.add_argument("--streaming", required=False, action="store_true")
+    parser.add_argument("--chunk_size", required=False, default=100, type=int)
+    parser.add_argument("--id_column", required=False, default="text_id")
+    parser.add_argument("--columns", nargs="+", required=False, default=None)
 
     args, unknown_args = parser.parse_known_args()
+    
+    if args.target_language is None and args.target_languages is None:
+        parser.error("one of `--target_language` or `--target_languages` is required")
+    
+    if args.target_languages is not None and args.async_mode:
+        parser.error("`--async_mode` supports only a single `--target_language`")
+    
+    if args.columns is not None:
+        required_columns = [args.text_column, args.id_column] if args.streaming else [args.text_column]
+        missing_columns = [column for column in required_columns if column not in args.columns]
+        if len(missing_columns) > 0:
+            parser.error(f"`--columns` must include {missing_columns}")
+    
+    if args.target_language is None:
+        args.target_language = args.target_languages[0]
+    
+    cache = None
+    if args.cache_path is not None:
+        cache = TranslationCache(path=args.cache_path, max_size=args.cache_max_size)
 
     back_translation = GoogleTranslateBackTranslation(
         source_language=args.source_language, 
@@ -131,16 +451,44 @@ if __name__ == "__main__":
         delay=args.delay,
         segment_delay=args.segment_delay,
         translations_delay=args.translations_delay,
+        cache=cache,
         p=1.0,
         **dict(unknown_args),
     )
     
-    data_frame = pd.read_csv(args.data_frame_path)
-    texts = data_frame[args.text_column].values
-
-    print(f"Back-translation '{args.source_language}' -> '{args.target_language}' -> '{args.source_language}' of {len(texts)} texts")
+    if args.target_languages is not None:
+        back_translate_func = lambda texts: back_translation.multi_back_translate(
+            texts, 
+            target_languages=args.target_languages,
+        )
+    elif args.async_mode:
+        back_translate_func = lambda texts: back_translation.async_back_translate(
+            texts, 
+            max_concurrency=args.max_concurrency, 
+            requests_per_second=args.requests_per_second, 
+            max_retries=args.max_retries,
+        )
+    else:
+        back_translate_func = back_translation
     
-    data_frame[args.back_translated_column] = back_translation(texts)
-    data_frame.to_csv(args.output_path, index=False)
+    target_languages = args.target_languages if args.target_languages is not None else [args.target_language]
+    print(f"Back-translation '{args.source_language}' -> {target_languages} -> '{args.source_language}' of '{args.data_frame_path}'")
+    
+    if args.streaming:
+        stream_back_translation(
+            back_translate_func=back_translate_func, 
+            data_frame_path=args.data_frame_path, 
+            output_path=args.output_path, 
+            text_column=args.text_column, 
+            back_translated_column=args.back_translated_column, 
+            id_column=args.id_column, 
+            chunk_size=args.chunk_size,
+            columns=args.columns,
+        )
+    else:
+        data_frame = read_table(args.data_frame_path, columns=args.columns)
+        texts = data_frame[args.text_column].values
+        assign_back_translated_texts(data_frame, back_translate_func(texts), args.back_translated_column)
+        write_table(data_frame, args.output_path)
     
     print(f"Back-translated texts were saved to '{args.output_path}'")
\ No newline at end of file
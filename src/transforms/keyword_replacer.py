@@ -1,7 +1,6 @@
 from transform import Transform
 from typing import Optional, Dict, List
 import numpy as np
-import random
 
 
 class KeywordReplacer(Transform):
@@ -10,8 +9,9 @@ class KeywordReplacer(Transform):
         keywords: Optional[Dict[str, List[str]]],
         level: str = "text", 
         p: float = 0.5, 
+        seed: Optional[int] = None,
     ):
-        super().__init__(p)
+        super().__init__(p, seed)
         
         self.keywords = keywords
         self.level = level
@@ -20,16 +20,17 @@ class KeywordReplacer(Transform):
             raise ValueError(f"`level` must be one of ['word', 'text'], but given {self.level}")
         
         
-    def apply(self, text: str) -> str:
-        if np.random.uniform() < self.p or self.level == "word":
-            text = self.transform(text)
+    def get_apply_mask(self, num_texts: int, rng: np.random.Generator) -> np.ndarray:
+        if self.level == "word":
+            return np.ones(num_texts, dtype=bool)
         
-        return text
-            
+        return super().get_apply_mask(num_texts, rng)
+    
     def transform(self, text: str) -> str:
-        for key, words in self.keywords.items():
-            if (key in text and len(words) > 0) and (self.level == "text" or np.random.uniform() < self.p):
-                random_word = random.choice(words)
+        apply_mask = self.rng.random(len(self.keywords)) < self.p
+        for (key, words), does_apply in zip(self.keywords.items(), apply_mask):
+            if (key in text and len(words) > 0) and (self.level == "text" or does_apply):
+                random_word = words[self.rng.integers(len(words))]
                 text = text.replace(key, random_word)
         
         return text
\ No newline at end of file
@@ -1,5 +1,6 @@
 from transform import Transform
 from utils import join_text_parts
+from typing import Optional, List
 from nltk.tokenize import word_tokenize
 from word2number.w2n import word_to_num as words2num
 from num2words import num2words
@@ -8,38 +9,51 @@ import re
 
 
 class NumberToWordsConverter(Transform):      
-    def __init__(self, level: str = "text", p: float = 0.5):
-        super().__init__(p)
+    token_level = True
+    
+    def __init__(self, level: str = "text", p: float = 0.5, seed: Optional[int] = None):
+        super().__init__(p, seed)
         self.level = level
         
         if self.level not in ("text", "word"):
             raise ValueError(f"`level` must be one of ['text', 'word'], but given {self.level}")
             
     
-    def apply(self, text: str) -> str:
-        if np.random.uniform() < self.p or self.level == "word":
-            text = self.transform(text)
+    def get_apply_mask(self, num_texts: int, rng: np.random.Generator) -> np.ndarray:
+        if self.level == "word":
+            return np.ones(num_texts, dtype=bool)
         
-        return text
+        return super().get_apply_mask(num_texts, rng)
+    
+    def convert_words(self, words: List[str]) -> List[str]:
+        apply_mask = self.rng.random(len(words)) < self.p
+        new_words = []
+        for word, does_apply in zip(words, apply_mask):
+            does_apply = (does_apply or self.level == "text")
+            if word.isdigit() and does_apply:
+                word = num2words(int(word))
+            elif does_apply:
+                try:
+                    word = words2num(word)
+                except ValueError:
+                    pass
+
+            new_words.append(word)
+        
+        return new_words
     
     def transform(self, text: str) -> str:
         numbers = re.findall('[0-9]+', text)
         
         if len(numbers) > 0:
             words = word_tokenize(text)
-            new_words = []
-            for word in words:
-                does_apply = (np.random.uniform() < self.p or self.level == "text")
-                if word.isdigit() and does_apply:
-                    word = num2words(int(word))
-                elif does_apply:
-                    try:
-                        word = words2num(word)
-                    except ValueError:
-                        pass
-
-                new_words.append(word)
-            
+            new_words = self.convert_words(words)
             text = join_text_parts(new_words)
             
-        return text    
\ No newline at end of file
+        return text
+    
+    def transform_tokens(self, tokens: List[str]) -> List[str]:
+        if any(re.search('[0-9]', token) for token in tokens):
+            tokens = [str(token) for token in self.convert_words(tokens)]
+        
+        return tokens    
\ No newline at end of file
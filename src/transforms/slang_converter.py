@@ -1,7 +1,10 @@
 from transform import Transform
-from typing import Optional, Dict
+from utils import compile_keys_pattern
+from typing import Optional, Dict, List, Tuple
+from functools import partial
 import contractions
 import numpy as np
+import heapq
 import re
 
 
@@ -12,23 +15,53 @@ class SlangConverter(Transform):
         slang_dict: Optional[Dict[str, str]] = None, 
         convert_full_to_slang: bool = False,
         punctuations: str = ".,:?! ", 
+        compiled: bool = True,
         p: float = 0.5,
+        seed: Optional[int] = None,
     ):
-        super().__init__(p)
+        super().__init__(p, seed)
         
         self.slang_dict = slang_dict
         self.level = level
         self.punctuations = punctuations
         self.convert_full_to_slang = convert_full_to_slang
+        self.compiled = compiled
         
         if self.level not in ("word", "text"):
             raise ValueError(f"`level` must be one of ['word', 'text'], but given {self.level}")
         
         if self.slang_dict is None:
-            self.slang_dict = contractions.contractions_dict
+            self.slang_dict = dict(contractions.contractions_dict)
             self.slang_dict.update(contractions.slang_dict)
             
         self.reversed_slang_dict = {full:slang for slang, full in self.slang_dict.items()}
+        
+        # per-pair patterns in the dictionary order, keys are escaped and matches consume the boundaries 
+        # as in the per-key path, so the same pairs apply in the same order
+        boundary = "[" + "".join(re.escape(punctuation) for punctuation in self.punctuations) + "]"
+        self.pairs = list(self.slang_dict.items())
+        self.slang_patterns = [re.compile(boundary + re.escape(slang) + boundary) for slang, _ in self.pairs]
+        self.full_patterns = [re.compile(boundary + re.escape(full) + boundary) for _, full in self.pairs]
+        
+        # pairs to check for every key found in the text, including keys which are prefixes of the found one
+        keys_pairs = {}
+        for index, (slang, full) in enumerate(self.pairs):
+            keys_pairs.setdefault(slang, set()).add(index)
+            if self.convert_full_to_slang:
+                keys_pairs.setdefault(full, set()).add(index)
+        
+        self.keys_pairs = {}
+        for key in keys_pairs.keys():
+            prefixes = [key[:length] for length in range(1, len(key) + 1) if key[:length] in keys_pairs]
+            self.keys_pairs[key] = set().union(*[keys_pairs[prefix] for prefix in prefixes])
+        
+        # longest key between boundaries at every position, keys without boundaries are never replaced
+        self.max_key_length = max([len(key) for key in self.keys_pairs.keys()], default=0)
+        self.keys_pattern = compile_keys_pattern(
+            keys=self.keys_pairs.keys(), 
+            prefix=f"(?<={boundary})(?=", 
+            suffix=f"{boundary})",
+        )
     
     def replace_function(self, match: re.Match, data: Dict[str, str]) -> str:
         text = match.group(0)
@@ -44,16 +77,70 @@ class SlangConverter(Transform):
         
         return punctuation_before + full + punctuation_after
             
-    def apply(self, text: str) -> str:
-        if np.random.uniform() < self.p or self.level == "word":
-            text = self.transform(text)
+    def get_apply_mask(self, num_texts: int, rng: np.random.Generator) -> np.ndarray:
+        if self.level == "word":
+            return np.ones(num_texts, dtype=bool)
+        
+        return super().get_apply_mask(num_texts, rng)
+    
+    def compiled_replace_function(self, match: re.Match, data: Dict[str, str], replacements: List[Tuple[int, int, int]]) -> str:
+        replacement = match.group(0)
+        if self.level == "text" or self.rng.random() < self.p:
+            replacement = self.replace_function(match, data=data)
+        
+        replacements.append((match.start(), match.end(), len(replacement)))
+        
+        return replacement
+    
+    def get_present_pairs(self, text: str, start: int = 0, end: Optional[int] = None) -> set:
+        """
+        Pairs whose slang (or full form) occurs between boundaries in `text[start:end]`, 
+        i.e. which the per-key path may change.
+        """
+        
+        end = len(text) if end is None else min(end, len(text))
+        keys = {match.group(1) for match in self.keys_pattern.finditer(text, max(start, 0), end)}
+        
+        return set().union(*[self.keys_pairs[key] for key in keys])
+    
+    def compiled_transform(self, text: str) -> str:
+        if self.keys_pattern is None:
+            return text
         
+        # pairs are tried in the dictionary order, a replacement may create keys of the later pairs around itself
+        pairs_heap = sorted(self.get_present_pairs(text))
+        seen_pairs = set(pairs_heap)
+        while len(pairs_heap) > 0:
+            index = heapq.heappop(pairs_heap)
+            slang, full = self.pairs[index]
+            if slang in text:
+                pattern, data = self.slang_patterns[index], self.slang_dict
+            elif self.convert_full_to_slang and full in text:
+                pattern, data = self.full_patterns[index], self.reversed_slang_dict
+            else:
+                continue
+            
+            replacements = []
+            text = pattern.sub(partial(self.compiled_replace_function, data=data, replacements=replacements), text)
+            
+            shift = 0
+            for start, end, length in replacements:
+                start, shift = start + shift, shift + length - (end - start)
+                window_pairs = self.get_present_pairs(text, start - self.max_key_length, start + length + self.max_key_length + 1)
+                for new_index in window_pairs - seen_pairs:
+                    if new_index > index:
+                        seen_pairs.add(new_index)
+                        heapq.heappush(pairs_heap, new_index)
+                        
         return text
         
     def transform(self, text: str) -> str:
+        if self.compiled:
+            return self.compiled_transform(text)
+        
         for slang, full in self.slang_dict.items():
             transformed = False
-            does_apply = (np.random.uniform() < self.p or self.level == "text")
+            does_apply = (self.rng.random() < self.p or self.level == "text")
             if slang in text and does_apply:
                 func = lambda match: self.replace_function(match, data=self.slang_dict)
                 text = re.sub(f"[{self.punctuations}]{slang}[{self.punctuations}]", func, text)
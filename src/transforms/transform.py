@@ -1,30 +1,70 @@
 import numpy as np
-from collections import Iterable
-from typing import List, Union
+from collections.abc import Iterable
+from typing import List, Union, Optional
 from tqdm import tqdm
+from executor import parallel_apply
 
 
 class Transform:
-    def __init__(self, p: float = 0.5) -> None:
+    # token-level transforms can work on a word-tokenized text through `transform_tokens`
+    token_level = False
+    
+    def __init__(self, p: float = 0.5, seed: Optional[int] = None) -> None:
         self.p = p
+        self.rng = np.random.default_rng(seed)
         
         if not (0.0 <= self.p <= 1):
             raise ValueError(f"`p` must be in range [0, 1], but given {self.p}")
            
     def apply(self, text: str) -> str:
-        if np.random.uniform() < self.p:
+        if self.get_apply_mask(1, self.rng)[0]:
             text = self.transform(text)
         
         return text
             
+    def get_apply_mask(self, num_texts: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.random(num_texts) < self.p
+    
+    def apply_batch(self, texts: List[str], rng: Optional[np.random.Generator] = None) -> List[str]:
+        """
+        Draws apply/skip decisions for all texts at once and transforms only the selected ones.
+        With `rng` both the decisions and the transformations draw from it during this call only, 
+        so a seeded `rng` makes the batch reproducible. By default the transform's own generator is used.
+        """
+        
+        if rng is None:
+            rng = self.rng
+        
+        transform_rng, self.rng = self.rng, rng
+        try:
+            texts = list(texts)
+            apply_mask = self.get_apply_mask(len(texts), rng)
+            for index in np.flatnonzero(apply_mask):
+                texts[index] = self.transform(texts[index])
+        finally:
+            self.rng = transform_rng
+        
+        return texts
+            
     def transform(self, text: str) -> str:
         return text
     
-    def __call__(self, text: Union[str, List[str]]) -> Union[str, List[str]]:
+    def transform_tokens(self, tokens: List[str]) -> List[str]:
+        raise NotImplementedError(f"{self.__class__.__name__} does not support token-level transformation")
+    
+    def __call__(self, text: Union[str, List[str]], num_workers: int = 1) -> Union[str, List[str]]:
         if isinstance(text, str):
             transformed_text = self.apply(text)
+        elif isinstance(text, Iterable) and num_workers > 1:
+            transformed_text = parallel_apply(
+                transforms=[self], 
+                texts=text, 
+                num_workers=num_workers, 
+                seed=int(self.rng.integers(2**63)),
+            )
+            transformed_text = list(tqdm(transformed_text, total=len(text)))
         elif isinstance(text, Iterable):
-            transformed_text = [self.apply(t) for t in tqdm(text, total=len(text))]
+            transformed_text = self.apply_batch(text)
         else:
             transformed_text = text
         
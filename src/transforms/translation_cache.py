@@ -0,0 +1,87 @@
+from typing import Optional
+import hashlib
+import sqlite3
+import time
+
+
+class TranslationCache:
+    """
+    Content-addressed SQLite cache of translations keyed by (text hash, source language, target language).
+    Least recently used translations are evicted once the stored texts exceed `max_size` bytes.
+    """
+    
+    def __init__(self, path: str = "translation_cache.sqlite", max_size: Optional[int] = None) -> None:
+        self.path = path
+        self.max_size = max_size
+        
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY, 
+                translation TEXT NOT NULL, 
+                size INTEGER NOT NULL, 
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+        self.connection.commit()
+        
+        self.size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        
+    @staticmethod
+    def get_key(text: str, source_language: str, target_language: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        
+        return f"{text_hash}:{source_language}:{target_language}"
+    
+    def get(self, text: str, source_language: str, target_language: str) -> Optional[str]:
+        key = self.get_key(text, source_language, target_language)
+        row = self.connection.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+        
+        if row is None:
+            return None
+        
+        self.connection.execute("UPDATE translations SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        
+        return row[0]
+    
+    def set(self, text: str, source_language: str, target_language: str, translation: str) -> None:
+        key = self.get_key(text, source_language, target_language)
+        size = len(text.encode("utf-8")) + len(translation.encode("utf-8"))
+        
+        row = self.connection.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.size -= row[0]
+        
+        self.connection.execute(
+            "INSERT OR REPLACE INTO translations (key, translation, size, accessed) VALUES (?, ?, ?, ?)", 
+            (key, translation, size, time.time()),
+        )
+        self.size += size
+        
+        if self.max_size is not None and self.size > self.max_size:
+            self.evict()
+        
+        self.connection.commit()
+        
+    def evict(self) -> None:
+        rows = self.connection.execute("SELECT key, size FROM translations ORDER BY accessed ASC")
+        
+        evicted_keys = []
+        for key, size in rows:
+            if self.size <= self.max_size:
+                break
+                
+            evicted_keys.append((key,))
+            self.size -= size
+        
+        self.connection.executemany("DELETE FROM translations WHERE key = ?", evicted_keys)
+        
+    def close(self) -> None:
+        self.connection.close()
+        
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
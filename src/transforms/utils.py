@@ -1,8 +1,12 @@
-from typing import Optional, Union, Iterable, List
+from typing import Optional, Union, Iterable, List, Dict, Any
 import string
+import re
 
 
-def join_text_parts(parts: List[str], punctuations: Optional[Union[Iterable, str]] = None) -> str:
+PUNCTUATIONS = frozenset(string.punctuation)
+
+
+def join_text_parts(parts: Iterable[str], punctuations: Optional[Union[Iterable, str]] = None) -> str:
     """
     Smart join of text's parts
     
@@ -11,14 +15,91 @@ def join_text_parts(parts: List[str], punctuations: Optional[Union[Iterable, str
     """
     
     if punctuations is None:
-        punctuations = string.punctuation 
+        punctuations = PUNCTUATIONS
+    elif not isinstance(punctuations, frozenset):
+        punctuations = frozenset(punctuations)
+    
+    # numpy arrays of strings are converted to python strings at once, other elements keep their numpy `str`
+    if getattr(getattr(parts, "dtype", None), "kind", None) in ("U", "O"):
+        parts = parts.tolist()
     
-    text = ""
+    pieces = []
     for part in parts:
-        part = str(part)
-        sep = " " if part[0] not in punctuations else ""  
-        text += sep + part
+        if not isinstance(part, str):
+            part = str(part)
+        
+        if part[0] not in punctuations:
+            pieces.append(" ")
+        pieces.append(part)
+    
+    text = "".join(pieces).strip()
+    
+    return text
+
+
+def build_trie(keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Character trie of keys, terminal nodes are marked with the empty string key.
+    """
+    
+    trie = {}
+    for key in keys:
+        if len(key) == 0:
+            continue
+            
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = True
+    
+    return trie
+
+
+def trie_to_pattern(node: Dict[str, Any]) -> Optional[str]:
+    """
+    Regular expression of trie, where every branch starts with a distinct character, 
+    so matching takes the longest key at each position without trying every key.
+    
+    Trie of ['colour', 'colours', 'color'] -> "colo(?:ur(?:s)?|r)"
+    """
+    
+    terminal = "" in node
+    
+    branches, chars = [], []
+    for char in sorted(key for key in node.keys() if key != ""):
+        sub_pattern = trie_to_pattern(node[char])
+        if sub_pattern is None:
+            chars.append(re.escape(char))
+        else:
+            branches.append(re.escape(char) + sub_pattern)
+            
+    if len(chars) == 1:
+        branches.append(chars[0])
+    elif len(chars) > 1:
+        branches.append("[" + "".join(chars) + "]")
+        
+    if len(branches) == 0:
+        return None
+    
+    if len(branches) > 1 or terminal:
+        pattern = "(?:" + "|".join(branches) + ")"
+    else:
+        pattern = branches[0]
+        
+    if terminal:
+        pattern += "?"
+        
+    return pattern
+
+
+def compile_keys_pattern(keys: Iterable[str], prefix: str = "", suffix: str = "", flags: int = 0) -> Optional[re.Pattern]:
+    """
+    Compiles keys into one trie-shaped alternation, which finds every key in a single left-to-right pass.
+    Returns None for empty keys.
+    """
     
-    text = text.strip()
+    pattern = trie_to_pattern(build_trie(keys))
+    if pattern is None:
+        return None
     
-    return text
\ No newline at end of file
+    return re.compile(prefix + "(" + pattern + ")" + suffix, flags)
\ No newline at end of file
@@ -1,23 +1,57 @@
 import pandas as pd
 import numpy as np
-from collections import Iterable
-from typing import List, Tuple, Dict, Any, Union
+from collections.abc import Iterable
+from typing import List, Tuple, Dict, Any, Union, Optional, Iterator
 import json
-import copy
 import re
 
+from storage import read_table, write_table, iterate_table_chunks
+
+
+DEFAULT_BINS = [0.0, 0.25, 0.75, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.25, 4.75]
+DEFAULT_LABELS = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]
+
 
 def convert_soft_to_hard_predictions(
     soft_predictions: np.ndarray, 
-    bins: List[float] = [0.0, 0.25, 0.75, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.25, 4.75], 
-    labels: List[float] = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0],
+    bins: List[float] = DEFAULT_BINS, 
+    labels: List[float] = DEFAULT_LABELS,
+    out: Optional[np.ndarray] = None,
+    chunk_size: Optional[int] = None,
 ) -> np.ndarray:
-
-    soft_predictions = np.clip(soft_predictions, a_min=0.0, a_max=5.0)
-    hard_predictions = np.digitize(soft_predictions, bins=bins, right=True)
-    hard_predictions = [labels[hard_prediction - 1] for hard_prediction in hard_predictions]
+    """
+    Maps every prediction in `(bins[i - 1], bins[i]]` to `labels[i - 1]` keeping shape and (floating) dtype.
+    `out` may be `soft_predictions` itself for in-place conversion, with `chunk_size` rows are converted 
+    chunk by chunk, e.g. for memory-mapped predictions.
+    """
+    
+    soft_predictions = np.asarray(soft_predictions)
+    dtype = soft_predictions.dtype if np.issubdtype(soft_predictions.dtype, np.floating) else np.float64
     
-    return hard_predictions
+    if out is None:
+        out = np.empty(soft_predictions.shape, dtype=dtype)
+    
+    # default bins are halves, so the lookup is just rounding
+    is_default_grid = np.array_equal(bins, DEFAULT_BINS) and np.array_equal(labels, DEFAULT_LABELS)
+    labels = np.asarray(labels, dtype=dtype)
+    
+    chunk_size = chunk_size if chunk_size is not None else max(len(soft_predictions), 1)
+    for start in range(0, len(soft_predictions), chunk_size):
+        chunk = np.clip(soft_predictions[start:start + chunk_size], a_min=0.0, a_max=5.0).astype(dtype, copy=False)
+        
+        if is_default_grid:
+            # rounding to halves, ties (.25 and .75) are rounded down as by the bins
+            chunk *= 2
+            chunk -= 0.5
+            np.ceil(chunk, out=chunk)
+            np.maximum(chunk, 0.0, out=chunk)
+            chunk /= 2
+            out[start:start + chunk_size] = chunk
+        else:
+            indexes = np.digitize(chunk, bins=bins, right=True)
+            out[start:start + chunk_size] = labels[np.maximum(indexes - 1, 0)]
+    
+    return out
 
 
 def get_private_values(text: str, pattern: str = "(Generic_[a-zA-Z]\w+)|((\w+[A-Z]_\w+))") -> List[str]:
@@ -117,6 +151,36 @@ def read_json(path: str, mode: str = "r", **kwargs) -> Dict[str, Any]:
     
     return data
 
+def get_num_words(texts: pd.Series) -> pd.Series:
+    """
+    Number of whitespace-separated words, same as `len(str(text).split())` without a Python call per text.
+    """
+    
+    # missing texts are counted as one word like `str(np.nan)`, they stay missing after `astype(str)` in newer pandas
+    return texts.astype(str).str.split().str.len().fillna(1).astype(np.int64)
+
+
+def get_selection_mask(
+    data_frame: pd.DataFrame, 
+    num_words: pd.Series,
+    min_words: int = 150, 
+    max_words: int = 1700, 
+    types: Union[str, List[str]] = "Essay",
+    type_column: str = "type", 
+) -> pd.Series:
+    words_threshold_mask = (min_words < num_words) & (num_words < max_words)
+    
+    types_values = data_frame[type_column]
+    if isinstance(types, str):
+        types_mask = types_values.str.contains(types, na=False)
+    elif isinstance(types, Iterable):
+        types_mask = types_values.isin(types)
+    else:
+        types_mask = True
+    
+    return words_threshold_mask & (types_values.isna() | types_mask)
+
+
 def basic_selection(
     data_frame: pd.DataFrame, 
     min_words: int = 150, 
@@ -126,38 +190,61 @@ def basic_selection(
     type_column: str = "type", 
     drop_extra_columns: bool = True,
 ) -> pd.DataFrame:
+    """
+    Keeps texts of `types` (or unknown type) with between `min_words` and `max_words` words 
+    and drops duplicated texts. The input data frame is not modified, only selected rows are copied.
+    """
     
-    data_frame = copy.deepcopy(data_frame)
-        
-    # length selection
-    data_frame["num_words"] = data_frame[text_column].apply(lambda text: len(str(text).split()))
-    words_threshold_mask = (min_words < data_frame["num_words"]) & (data_frame["num_words"] < max_words)
-    data_frame = data_frame[words_threshold_mask]
-    
-    # type selection
-    if isinstance(types, str):
-        types_mask = data_frame[type_column].str.contains(types)
-    elif isinstance(types, Iterable):
-        types_mask = data_frame[type_column].isin(types)
-    else:
-        types_mask = np.ones(shape=data_frame.shape[0], dtype=bool)
+    num_words = get_num_words(data_frame[text_column])
+    selected_data_mask = get_selection_mask(
+        data_frame=data_frame, 
+        num_words=num_words, 
+        min_words=min_words, 
+        max_words=max_words, 
+        types=types, 
+        type_column=type_column,
+    )
     
-    na_types_mask = data_frame[type_column].isna()
+    # removing duplicates among the selected texts only
+    selected_data_mask = np.array(selected_data_mask, dtype=bool)
+    duplicates_mask = data_frame[text_column][selected_data_mask].duplicated().values
+    selected_data_mask[np.flatnonzero(selected_data_mask)[duplicates_mask]] = False
     
-    selected_data_mask = na_types_mask | types_mask
     data_frame = data_frame[selected_data_mask]
     
-    # removing duplicates
-    data_frame = data_frame.drop_duplicates(subset=["full_text"])
-    
-    # dropping extra columns
-    if drop_extra_columns:
-        extra_columns = ["num_words"]
-        data_frame = data_frame.drop(extra_columns, axis=1)
+    if not drop_extra_columns:
+        data_frame = data_frame.assign(num_words=num_words.values[selected_data_mask])
     
     return data_frame
 
 
+def iterate_basic_selection(
+    data: Union[str, Iterable],
+    chunk_size: int = 10000,
+    text_column: str = "full_text",
+    columns: Optional[List[str]] = None,
+    **selection_args,
+) -> Iterator[pd.DataFrame]:
+    """
+    `basic_selection` over chunks of a table file (CSV/Parquet/Arrow) or of an iterable of data frames, 
+    so corpora larger than memory can be selected. Duplicates are dropped across chunks 
+    by 64-bit hashes of already selected texts.
+    """
+    
+    chunks = iterate_table_chunks(data, chunk_size=chunk_size, columns=columns) if isinstance(data, str) else data
+    seen_hashes = set()
+    
+    for chunk in chunks:
+        chunk = basic_selection(chunk, text_column=text_column, **selection_args)
+        
+        hashes = pd.util.hash_pandas_object(chunk[text_column], index=False).tolist()
+        new_mask = np.array([text_hash not in seen_hashes for text_hash in hashes], dtype=bool)
+        seen_hashes.update(hashes)
+        
+        if new_mask.any():
+            yield chunk[new_mask]
+
+
 def get_confident_predictions(
     predictions: np.ndarray, 
     confidence_threshold: float = 0.1, 
@@ -177,4 +264,225 @@ def get_confident_predictions(
         
         return predictions, indexes
     
-    return predictions
\ No newline at end of file
+    return predictions
+
+
+def read_predictions(path: str, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Memory-mapped predictions from '.npy' file or (only `columns` of) a table file, e.g. Parquet.
+    """
+    
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    
+    return read_table(path, columns=columns).values
+
+
+def get_streaming_confident_predictions(
+    predictions_paths: List[str], 
+    confidence_threshold: Union[float, List[float]] = 0.1, 
+    columns: Optional[List[str]] = None,
+    chunk_size: int = 100000,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Same criterion as `get_confident_predictions`, but models' predictions are read one file at a time 
+    and the ensemble mean and variance are updated with Welford's algorithm, so predictions are never stacked.
+    `confidence_threshold` may be given per target (last axis).
+    
+    Returns confidence mask (std < threshold) of predictions' shape, indexes of samples confident 
+    in all targets and the ensemble mean.
+    """
+    
+    mean, squared_deviations = None, None
+    for num_models, predictions_path in enumerate(predictions_paths, start=1):
+        predictions = read_predictions(predictions_path, columns=columns)
+        
+        if mean is None:
+            mean = np.zeros(predictions.shape, dtype=np.float64)
+            squared_deviations = np.zeros(predictions.shape, dtype=np.float64)
+        elif predictions.shape != mean.shape:
+            raise ValueError(f"Predictions of '{predictions_path}' have shape {predictions.shape}, but expected {mean.shape}")
+        
+        for start in range(0, len(predictions), chunk_size):
+            chunk = np.asarray(predictions[start:start + chunk_size], dtype=np.float64)
+            chunk_mean = mean[start:start + chunk_size]
+            
+            delta = chunk - chunk_mean
+            chunk_mean += delta / num_models
+            squared_deviations[start:start + chunk_size] += delta * (chunk - chunk_mean)
+        
+        del predictions
+    
+    if mean is None:
+        raise ValueError("At least one predictions file is required")
+    
+    std = np.sqrt(squared_deviations / num_models)
+    confidence_mask = std < np.asarray(confidence_threshold)
+    indexes = np.flatnonzero(confidence_mask.reshape(len(confidence_mask), -1).all(axis=1))
+    
+    return confidence_mask, indexes, mean
+
+
+def get_k_smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of `k` smallest values in ascending order, equal values are ordered by position.
+    Linear time in contrast to the full sorting.
+    """
+    
+    if len(values) <= k:
+        return np.argsort(values, kind="stable")
+    
+    kth_value = np.partition(values, k - 1)[k - 1]
+    smaller_positions = np.flatnonzero(values < kth_value)
+    equal_positions = np.flatnonzero(values == kth_value)[:k - len(smaller_positions)]
+    positions = np.concatenate([smaller_positions, equal_positions])
+    
+    return positions[np.argsort(values[positions], kind="stable")]
+
+
+def get_mean_absolute_differences(labels_columns: np.ndarray, sample_labels: np.ndarray) -> np.ndarray:
+    # same summation order as `np.mean(np.abs(...), axis=-1)`, so distances (and their ties) are identical
+    distances = np.zeros(labels_columns.shape[1])
+    for label_column, sample_label in zip(labels_columns, sample_labels):
+        distances += np.abs(label_column - sample_label)
+    
+    return distances / len(labels_columns)
+
+
+def select_k_nearest_labels_positions(
+    labels: np.ndarray, 
+    external_labels: np.ndarray, 
+    k: int = 5, 
+    leaf_size: int = 64,
+) -> np.ndarray:
+    """
+    Greedily selects `k` nearest (by mean absolute difference) not yet selected external samples 
+    for each sample in order, returns positions of external samples in the selection order.
+    
+    External samples are indexed by leaves of a KD-tree (bounding boxes of `leaf_size` samples). 
+    For each sample only the leaves nearest by the lower bound of distance are scanned, until no other leaf 
+    can contain a nearer (or equally near) external sample. Selected samples are only masked out.
+    """
+    
+    labels = np.asarray(labels, dtype=np.float64)
+    external_labels = np.asarray(external_labels, dtype=np.float64)
+    num_external_samples = len(external_labels)
+    
+    if num_external_samples == 0:
+        return np.array([], dtype=np.int64)
+    
+    # KD-tree leaves, i.e. groups of samples split by medians of the widest label
+    leaves, groups = [], [np.arange(num_external_samples)]
+    while len(groups) > 0:
+        group = groups.pop()
+        if len(group) <= leaf_size:
+            leaves.append(np.sort(group))
+            continue
+        
+        group_labels = external_labels[group]
+        split_label = np.argmax(group_labels.max(axis=0) - group_labels.min(axis=0))
+        middle = len(group) // 2
+        group = group[np.argpartition(group_labels[:, split_label], middle)]
+        groups.extend([group[:middle], group[middle:]])
+    
+    # positions are grouped by leaves and kept in the original order inside of a leaf
+    leaves_positions = np.concatenate(leaves)
+    leaves_bounds = np.cumsum([0] + [len(leaf) for leaf in leaves])
+    leaves_indexes = np.empty(num_external_samples, dtype=np.int64)
+    leaves_indexes[leaves_positions] = np.repeat(np.arange(len(leaves)), np.diff(leaves_bounds))
+    
+    leaves_starts = np.stack([external_labels[leaf].min(axis=0) for leaf in leaves])
+    leaves_ends = np.stack([external_labels[leaf].max(axis=0) for leaf in leaves])
+    
+    labels_columns = np.ascontiguousarray(external_labels.T)
+    available_mask = np.ones(num_external_samples, dtype=bool)
+    leaves_num_available = np.diff(leaves_bounds)
+    num_available = num_external_samples
+    
+    def get_leaves_candidates(selected_leaves: np.ndarray) -> np.ndarray:
+        if len(selected_leaves) == 0:
+            return np.array([], dtype=np.int64)
+        
+        positions = np.concatenate([leaves_positions[leaves_bounds[leaf]:leaves_bounds[leaf + 1]] for leaf in selected_leaves])
+        
+        return positions[available_mask[positions]]
+    
+    selected_positions = []
+    for sample_labels in labels:
+        # stopping conditions
+        if num_available == 0:
+            break
+        
+        sample_k = min(k, num_available)
+        
+        # lower bounds of distances to samples in every leaf
+        gaps = np.maximum(np.maximum(leaves_starts - sample_labels, sample_labels - leaves_ends), 0)
+        leaves_distances = gaps.mean(axis=1)
+        
+        # nearest leaves having at least k available samples give an upper bound of the k-th distance
+        num_nearest_leaves = min(4, len(leaves))
+        while True:
+            nearest_leaves = np.argpartition(leaves_distances, num_nearest_leaves - 1)[:num_nearest_leaves]
+            if leaves_num_available[nearest_leaves].sum() >= sample_k or num_nearest_leaves == len(leaves):
+                break
+            
+            num_nearest_leaves = min(num_nearest_leaves * 4, len(leaves))
+        
+        candidates = get_leaves_candidates(nearest_leaves)
+        distances = get_mean_absolute_differences(labels_columns[:, candidates], sample_labels)
+        kth_distance = np.partition(distances, sample_k - 1)[sample_k - 1]
+        
+        # all leaves which may have nearer (or equally near) samples
+        nearer_leaves_mask = leaves_distances <= kth_distance + 1e-9
+        nearer_leaves_mask[nearest_leaves] = False
+        candidates = np.concatenate([candidates, get_leaves_candidates(np.flatnonzero(nearer_leaves_mask))])
+        
+        # equal distances are ordered by positions as in the full scan
+        candidates = np.sort(candidates)
+        distances = get_mean_absolute_differences(labels_columns[:, candidates], sample_labels)
+        nearest_positions = candidates[get_k_smallest(distances, k=sample_k)]
+        
+        available_mask[nearest_positions] = False
+        np.subtract.at(leaves_num_available, leaves_indexes[nearest_positions], 1)
+        num_available -= sample_k
+        selected_positions.extend(nearest_positions.tolist())
+        
+    return np.array(selected_positions, dtype=np.int64)
+
+
+def select_k_nearest_labels_samples(
+    data: pd.DataFrame, 
+    external_data: pd.DataFrame, 
+    labels_columns: List[str], 
+    k: int = 5,
+    fold_column: Optional[str] = None,
+    output_path: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Selects top k nearest label-wise samples for each instance/object in the given data.
+    With `fold_column` the selection is done independently for every fold of external data 
+    (e.g. pseudo labels of every fold) and the selected samples are concatenated fold by fold.
+    """
+    
+    labels = data[labels_columns].values
+    
+    if fold_column is None:
+        folds_external_data = [external_data]
+    else:
+        folds_external_data = [fold_external_data for _, fold_external_data in external_data.groupby(fold_column, sort=True)]
+    
+    selected_external_data = []
+    for fold_external_data in folds_external_data:
+        selected_positions = select_k_nearest_labels_positions(
+            labels=labels, 
+            external_labels=fold_external_data[labels_columns].values, 
+            k=k, 
+        )
+        selected_external_data.append(fold_external_data.iloc[selected_positions])
+        
+    selected_external_data = pd.concat(selected_external_data)
+    
+    if output_path is not None:
+        write_table(selected_external_data, output_path)
+    
+    return selected_external_data
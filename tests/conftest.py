@@ -0,0 +1,23 @@
+import sys
+import os
+import importlib.util
+import pytest
+
+# transforms come before src/, both have their own `utils` module
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "parsers"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "transforms"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@pytest.fixture(scope="session")
+def src_utils():
+    """
+    src/utils.py, loaded by its path since `utils` resolves to the transforms' module.
+    """
+    
+    path = os.path.join(os.path.dirname(__file__), "..", "src", "utils.py")
+    spec = importlib.util.spec_from_file_location("src_utils", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    
+    return module
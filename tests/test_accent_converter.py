@@ -0,0 +1,33 @@
+from utils import build_trie, trie_to_pattern, compile_keys_pattern
+from accent_converter import AccentConverter
+
+
+def test_trie_pattern():
+    assert build_trie(["color", "co", ""]) == {"c": {"o": {"": True, "l": {"o": {"r": {"": True}}}}}}
+    assert trie_to_pattern(build_trie(["colour", "colours", "color"])) == "colo(?:ur(?:s)?|r)"
+    assert compile_keys_pattern([]) is None
+
+
+def test_keys_pattern_takes_longest_key_and_escapes():
+    keys = ["colour", "colours", "a.m.", "c++"]
+    pattern = compile_keys_pattern(keys)
+    
+    assert pattern.findall("colours colour colourful a.m. abmx c++") == ["colours", "colour", "colour", "a.m.", "c++"]
+
+
+def test_accent_converter_both_directions():
+    accent_dict = {"colour": "color", "colours": "colors", "centre": "center"}
+    
+    converted_texts = {AccentConverter(accent_dict, p=1.0, seed=seed).transform("colours of the centre, colour") for seed in range(10)}
+    
+    assert converted_texts == {"colors of the center, color", "colours of the centre, colour"}
+    assert {AccentConverter(accent_dict, p=1.0, seed=seed).transform("color center") for seed in range(10)} == {
+        "color center", 
+        "colour centre",
+    }
+
+
+def test_accent_converter_does_not_rematch_replacements():
+    converter = AccentConverter({"a": "b", "b": "c"}, p=1.0, seed=0)
+    
+    assert {converter.transform("ab") for _ in range(10)} == {"bc", "aa"}
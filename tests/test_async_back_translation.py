@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pytest
+
+from async_back_translation import AsyncBackTranslation, StubTranslator, TokenBucket, call_with_retries
+
+
+class CountingTranslator(StubTranslator):
+    """
+    Stub translator recording the maximum number of in-flight requests, 
+    shorter texts are translated slower so completion order differs from input order.
+    """
+    
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.num_in_flight = 0
+        self.max_in_flight = 0
+        
+    async def translate(self, text: str, source_language: str, target_language: str) -> str:
+        self.num_in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.num_in_flight)
+        try:
+            await asyncio.sleep(0.05 / len(text))
+            return await super().translate(text, source_language, target_language)
+        finally:
+            self.num_in_flight -= 1
+
+
+def get_texts(num_texts: int) -> list:
+    return [f"Essay number {index}." + " More words." * index for index in range(num_texts)]
+
+
+def test_concurrency_limit_and_order():
+    translator = CountingTranslator(latency=0.01)
+    back_translation = AsyncBackTranslation(translator, max_concurrency=3, requests_per_second=1000)
+    texts = get_texts(20)
+    
+    back_translated_texts = back_translation(texts, verbose=False)
+    
+    assert back_translated_texts == texts
+    assert translator.max_in_flight == 3
+    assert translator.num_calls == 2 * len(texts)
+
+
+def test_retries_after_transient_failures():
+    translator = StubTranslator(failure_rate=0.3, seed=0)
+    back_translation = AsyncBackTranslation(translator, requests_per_second=1000, max_retries=10, backoff=0.001)
+    texts = get_texts(10)
+    
+    back_translated_texts = back_translation(texts, verbose=False)
+    
+    assert back_translated_texts == texts
+    assert translator.num_calls > 2 * len(texts)
+
+
+def test_retries_are_exhausted():
+    async def fail() -> str:
+        fail.num_calls += 1
+        raise ConnectionError("failure")
+    
+    fail.num_calls = 0
+    
+    with pytest.raises(ConnectionError):
+        asyncio.run(call_with_retries(fail, max_retries=2, backoff=0.001))
+        
+    assert fail.num_calls == 3
+
+
+def test_token_bucket_rate():
+    async def acquire_many(num_requests: int) -> float:
+        rate_limiter = TokenBucket(rate=20.0, capacity=1.0)
+        start = time.monotonic()
+        for _ in range(num_requests):
+            await rate_limiter.acquire()
+        
+        return time.monotonic() - start
+    
+    # the first request uses the initial token, the other 10 wait 1 / 20 seconds each
+    elapsed = asyncio.run(acquire_many(11))
+    
+    assert 0.45 <= elapsed < 1.0
+
+
+def test_token_bucket_rate_must_be_positive():
+    async def create() -> TokenBucket:
+        return TokenBucket(rate=0.0)
+    
+    with pytest.raises(ValueError):
+        asyncio.run(create())
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from google_translate_back_translation import GoogleTranslateBackTranslation
+
+
+ESSAY = "First sentence of the essay. Second one!\n\nThe next paragraph starts here.\n  An indented line\nends without a period "
+
+
+class StubTranslator:
+    """
+    Identity translation, or uppercase to `uppercase_language`, requests are recorded.
+    """
+    
+    def __init__(self, uppercase_language: str = None) -> None:
+        self.uppercase_language = uppercase_language
+        self.requests = []
+    
+    def translate(self, text: str, src: str, dest: str) -> SimpleNamespace:
+        self.requests.append(text)
+        
+        return SimpleNamespace(text=text.upper() if dest == self.uppercase_language else text)
+
+
+def get_back_translation(translator: StubTranslator) -> GoogleTranslateBackTranslation:
+    return GoogleTranslateBackTranslation(
+        translator=translator, 
+        source_language="en", 
+        target_language="fr", 
+        delay=0.0, 
+        segment_delay=0.0, 
+        translations_delay=0.0, 
+        p=1.0,
+    )
+
+
+def test_split_text_into_segments_and_separators():
+    segments, separators = get_back_translation(StubTranslator()).split_text_into_segments_and_separators(ESSAY)
+    
+    assert len(separators) == len(segments) + 1
+    assert "".join(separator + segment for separator, segment in zip(separators, segments)) + separators[-1] == ESSAY
+    assert "\n\n" in separators
+
+
+def test_multi_back_translate_round_trips_identity():
+    back_translation = get_back_translation(StubTranslator())
+    
+    back_translated_texts = back_translation.multi_back_translate([ESSAY, "Short text."], target_languages=["fr", "de"])
+    
+    assert back_translated_texts == {"fr": [ESSAY, "Short text."], "de": [ESSAY, "Short text."]}
+
+
+def test_multi_back_translate_matches_single_language():
+    back_translation = get_back_translation(StubTranslator(uppercase_language="fr"))
+    
+    single_language_text = back_translation.transform(ESSAY)
+    back_translated_texts = back_translation.multi_back_translate([ESSAY], target_languages=["fr"])
+    
+    assert back_translated_texts["fr"] == [single_language_text] == [ESSAY.upper()]
+
+
+def test_requests_do_not_mix_texts():
+    translator = StubTranslator()
+    texts = ["First text. Has two sentences.", "Second text."]
+    
+    get_back_translation(translator).multi_back_translate(texts, target_languages=["fr"])
+    
+    assert all(not ("First" in request and "Second" in request) for request in translator.requests)
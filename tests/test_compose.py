@@ -0,0 +1,50 @@
+from typing import List
+import numpy as np
+
+from transform import Transform
+from compose import Compose
+
+
+class AppendNumber(Transform):
+    def transform(self, text: str) -> str:
+        return f"{text} {self.rng.integers(1000)}"
+
+
+def get_compose(num_workers: int, seed: int = 42) -> Compose:
+    transforms = [AppendNumber(p=0.5), AppendNumber(p=0.7)]
+    
+    return Compose(transforms, num_workers=num_workers, shard_size=8, seed=seed)
+
+
+def get_texts(num_texts: int = 50) -> List[str]:
+    return [f"text {index}" for index in range(num_texts)]
+
+
+def test_parallel_compose_is_reproducible():
+    texts = get_texts()
+    
+    transformed_texts = get_compose(num_workers=2)(texts)
+    
+    assert transformed_texts == get_compose(num_workers=2)(texts)
+    assert transformed_texts == get_compose(num_workers=3)(texts)
+    assert [text.split()[:2] for text in transformed_texts] == [text.split() for text in texts]
+    assert transformed_texts != get_compose(num_workers=2, seed=0)(texts)
+
+
+def test_serial_compose_is_reproducible():
+    texts = get_texts()
+    
+    assert get_compose(num_workers=1)(texts) == get_compose(num_workers=1)(texts)
+    assert get_compose(num_workers=1)(texts[0]) == get_compose(num_workers=1)(texts[0])
+
+
+def test_apply_batch_rng_seeds_transformations():
+    texts = get_texts()
+    transform = AppendNumber(p=0.5, seed=1)
+    transform_rng = transform.rng
+    
+    transformed_texts = transform.apply_batch(texts, rng=np.random.default_rng(7))
+    
+    assert transformed_texts == AppendNumber(p=0.5, seed=2).apply_batch(texts, rng=np.random.default_rng(7))
+    assert transformed_texts != transform.apply_batch(texts, rng=np.random.default_rng(8))
+    assert transform.rng is transform_rng
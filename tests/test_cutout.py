@@ -0,0 +1,45 @@
+import math
+import numpy as np
+
+from cutout import CutOut
+
+
+def get_texts(num_texts: int = 30) -> list:
+    return [" ".join(f"w{index}" for index in range(num_words)) for num_words in range(1, num_texts + 1)]
+
+
+def is_subsequence(tokens: list, other_tokens: list) -> bool:
+    other_tokens = iter(other_tokens)
+    
+    return all(token in other_tokens for token in tokens)
+
+
+def test_apply_batch_drops_fraction_of_words_in_order():
+    texts = get_texts()
+    cutout = CutOut(level="word", fraction=0.2, p=1.0, seed=0)
+    
+    for text, transformed_text in zip(texts, cutout.apply_batch(texts)):
+        words, transformed_words = text.split(), transformed_text.split()
+        
+        assert len(transformed_words) == len(words) - math.ceil(len(words) * 0.2)
+        assert is_subsequence(transformed_words, words)
+
+
+def test_apply_batch_is_reproducible():
+    texts = get_texts()
+    
+    transformed_texts = CutOut(fraction=0.3, p=0.5, seed=1).apply_batch(texts)
+    
+    assert transformed_texts == CutOut(fraction=0.3, p=0.5, seed=2).apply_batch(texts, rng=np.random.default_rng(1))
+    assert transformed_texts == CutOut(fraction=0.3, p=0.5, seed=1).apply_batch(texts)
+    assert transformed_texts != CutOut(fraction=0.3, p=0.5, seed=3).apply_batch(texts)
+    assert CutOut(fraction=0.3, p=0.0, seed=1).apply_batch(texts) == texts
+
+
+def test_transform_tokens_and_sentences():
+    tokens = [f"w{index}" for index in range(10)]
+    
+    cut_tokens = CutOut(fraction=0.25, p=1.0, seed=0).transform_tokens(tokens)
+    
+    assert len(cut_tokens) == 7 and is_subsequence(cut_tokens, tokens)
+    assert CutOut(level="sentence", fraction=1.0, p=1.0, seed=0).transform("One. Two.") == ""
@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from deduplication import SignatureIndex, near_duplicates_selection, find_near_duplicates_clusters, MinHasher
+
+
+def get_essays(num_essays: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"word{index}" for index in range(5000)]
+    
+    return [" ".join(rng.choice(vocabulary, size=200)) for _ in range(num_essays)]
+
+
+def test_near_duplicates_clusters():
+    essays = get_essays(3)
+    # one word changed keeps Jaccard similarity of 5-grams high
+    near_duplicate = essays[0].replace(essays[0].split()[100], "changed", 1)
+    signatures = MinHasher().signatures(essays + [near_duplicate])
+    
+    labels = find_near_duplicates_clusters(signatures, threshold=0.8)
+    
+    assert labels.tolist() == [0, 1, 2, 0]
+
+
+def test_incremental_rerun_keeps_previously_selected_rows(tmp_path):
+    essays = get_essays(8)
+    data_frame = pd.DataFrame({"url": [f"u{index}" for index in range(8)], "text": essays})
+    index = SignatureIndex(path=str(tmp_path / "signatures.sqlite"))
+    
+    first_selected, _ = near_duplicates_selection(data_frame.iloc[:7], text_column="text", key_column="url", index=index, update_index=True)
+    assert first_selected["url"].tolist() == [f"u{index}" for index in range(7)]
+    
+    # the output file grew by one essay and a copy of an already indexed essay under another key
+    grown_data_frame = pd.concat([data_frame, pd.DataFrame({"url": ["copy"], "text": [essays[3]]})], ignore_index=True)
+    second_selected, _ = near_duplicates_selection(grown_data_frame, text_column="text", key_column="url", index=index, update_index=True)
+    
+    assert second_selected["url"].tolist() == [f"u{index}" for index in range(8)]
+    assert len(index) == 8
+    
+    index.close()
+
+
+def test_index_settings_are_checked(tmp_path):
+    path = str(tmp_path / "signatures.sqlite")
+    SignatureIndex(path=path, num_bands=16).close()
+    
+    with pytest.raises(ValueError):
+        SignatureIndex(path=path, num_bands=32)
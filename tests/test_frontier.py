@@ -0,0 +1,64 @@
+import json
+import pandas as pd
+
+from frontier import CrawlFrontier, EssaysWriter
+from storage import read_table
+
+
+def test_frontier_statuses_persist(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    frontier = CrawlFrontier(path)
+    frontier.add(["a", "b", "c"])
+    frontier.mark_done("a")
+    frontier.mark_failed("b")
+    frontier.add(["a", "d"])
+    frontier.close()
+    
+    frontier = CrawlFrontier(path)
+    
+    assert frontier.is_done("a") and not frontier.is_done("b") and not frontier.is_done("e")
+    assert sorted(frontier.get_urls("pending")) == ["c", "d"]
+    assert frontier.get_urls("failed") == ["b"]
+    assert frontier.count("done") == 1
+
+
+def test_csv_writer_appends_with_existing_columns_order(tmp_path):
+    path = str(tmp_path / "essays.csv")
+    flushed_urls = []
+    
+    writer = EssaysWriter(path, on_flush=lambda essays: flushed_urls.extend(essay["url"] for essay in essays))
+    writer.write({"url": "a", "text": "first, essay"})
+    writer.close()
+    
+    writer = EssaysWriter(path, on_flush=lambda essays: flushed_urls.extend(essay["url"] for essay in essays))
+    writer.write({"text": "second\nessay", "url": "b", "extra": 1})
+    writer.close()
+    
+    assert flushed_urls == ["a", "b"]
+    assert pd.read_csv(path).to_dict("records") == [
+        {"url": "a", "text": "first, essay"}, 
+        {"url": "b", "text": "second\nessay"},
+    ]
+
+
+def test_jsonl_and_parquet_writers(tmp_path):
+    jsonl_path = str(tmp_path / "essays.jsonl")
+    writer = EssaysWriter(jsonl_path)
+    writer.write({"url": "a", "subject": ["Education"]})
+    writer.close()
+    
+    with open(jsonl_path, encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == [{"url": "a", "subject": ["Education"]}]
+    
+    parquet_path = str(tmp_path / "essays.parquet")
+    flushed_urls = []
+    writer = EssaysWriter(parquet_path, rows_per_part=2, on_flush=lambda essays: flushed_urls.extend(essay["url"] for essay in essays))
+    for url in "abc":
+        writer.write({"url": url})
+    
+    assert flushed_urls == ["a", "b"]
+    
+    writer.close()
+    
+    assert flushed_urls == ["a", "b", "c"]
+    assert sorted(read_table(parquet_path)["url"]) == ["a", "b", "c"]
@@ -0,0 +1,134 @@
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+import threading
+import os
+import pytest
+
+from ivypanda import get_essays_concurrently, get_essays_pipelined, extract_essay_info, parse
+from storage import read_table
+
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures", "ivypanda")
+NUM_PAGES = 6
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIRECTORY, name), mode="r", encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.fixture()
+def site(tmp_path):
+    """
+    Serves saved listing and essay pages from a local HTTP server and records the requested paths.
+    """
+    
+    requested_paths = []
+    
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self) -> None:
+            requested_paths.append(self.path)
+            super().do_GET()
+        
+        def log_message(self, *args) -> None:
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(tmp_path)))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    os.makedirs(tmp_path / "essays")
+    listing_html, essay_html = read_fixture("listing.html"), read_fixture("essay.html")
+    for page in range(1, NUM_PAGES + 1):
+        page_html = listing_html.replace("__BASE_URL__", base_url)
+        page_html = page_html.replace("__FIRST_ESSAY__", f"{page}-1").replace("__SECOND_ESSAY__", f"{page}-2")
+        (tmp_path / f"page-{page}.html").write_text(page_html, encoding="utf-8")
+        
+        for essay in (1, 2):
+            (tmp_path / "essays" / f"{page}-{essay}.html").write_text(essay_html, encoding="utf-8")
+    
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    yield base_url, requested_paths
+    
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_essays_concurrently(site):
+    base_url, requested_paths = site
+    
+    essays = list(get_essays_concurrently(
+        url=base_url, 
+        num_pagination_pages=NUM_PAGES, 
+        pagination_page_format="{url}/page-{page}.html", 
+        max_workers=2, 
+        requests_per_second=None,
+    ))
+    
+    expected_urls = {f"{base_url}/essays/{page}-{essay}.html" for page in range(1, NUM_PAGES + 1) for essay in (1, 2)}
+    assert {essay["url"] for essay in essays} == expected_urls
+    assert all(essay["subject"] == ["Education", "Literature"] for essay in essays)
+    
+    # essays of the first listing pages are fetched before the listing pass is over
+    first_essay_request = min(index for index, path in enumerate(requested_paths) if path.startswith("/essays/"))
+    last_page_request = requested_paths.index(f"/page-{NUM_PAGES}.html")
+    assert first_essay_request < last_page_request
+
+
+def test_get_essays_pipelined(site):
+    base_url, _ = site
+    
+    essays = list(get_essays_pipelined(
+        url=base_url, 
+        num_pagination_pages=NUM_PAGES, 
+        pagination_page_format="{url}/page-{page}.html", 
+        max_workers=2, 
+        num_extractors=1, 
+        requests_per_second=None,
+    ))
+    
+    expected_urls = {f"{base_url}/essays/{page}-{essay}.html" for page in range(1, NUM_PAGES + 1) for essay in (1, 2)}
+    assert sorted(essay["url"] for essay in essays) == sorted(expected_urls)
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_extract_essay_info(backend):
+    essay = extract_essay_info(html=read_fixture("essay.html"), url="essay.html", backend=backend)
+    
+    assert essay == {
+        "url": "essay.html", 
+        "topic": "Essay on Reading Habits", 
+        "text": 'Reading every day builds vocabulary.\n\nIt also helps to "focus" for longer periods.', 
+        "subject": ["Education", "Literature"], 
+        "type": "Essay",
+    }
+
+
+def test_incremental_parse_fetches_only_new_essays(site, tmp_path):
+    base_url, requested_paths = site
+    output_path = str(tmp_path / "essays.csv")
+    index_path = tmp_path / "index.html"
+    
+    # the first run sees 2 pagination pages
+    index_path.write_text((tmp_path / "page-1.html").read_text(encoding="utf-8"), encoding="utf-8")
+    parse(url=base_url, output_path=output_path, pagination_page_format="{url}/page-{page}.html", incremental=True)
+    
+    assert len(read_table(output_path)) == 4
+    
+    requested_paths.clear()
+    parse(url=base_url, output_path=output_path, pagination_page_format="{url}/page-{page}.html", incremental=True)
+    
+    assert not any(path.startswith("/essays/") for path in requested_paths)
+    
+    # a monthly refresh with a new pagination page
+    index_html = index_path.read_text(encoding="utf-8")
+    index_path.write_text(index_html.replace(">2</a>", ">2</a><a>3</a>"), encoding="utf-8")
+    requested_paths.clear()
+    parse(url=base_url, output_path=output_path, pagination_page_format="{url}/page-{page}.html", incremental=True)
+    
+    assert sorted(path for path in requested_paths if path.startswith("/essays/")) == ["/essays/3-1.html", "/essays/3-2.html"]
+    
+    essays = read_table(output_path)
+    expected_urls = {f"{base_url}/essays/{page}-{essay}.html" for page in range(1, 4) for essay in (1, 2)}
+    assert len(essays) == 6 and set(essays["url"]) == expected_urls
@@ -0,0 +1,38 @@
+import string
+import numpy as np
+
+from utils import join_text_parts
+
+
+def join_text_parts_concatenation(parts, punctuations=string.punctuation) -> str:
+    """
+    The original quadratic join by string concatenation.
+    """
+    
+    text = ""
+    for part in parts:
+        part = str(part)
+        sep = " " if part[0] not in punctuations else ""
+        text += sep + part
+    
+    return text.strip()
+
+
+def test_join_text_parts_examples():
+    assert join_text_parts(["It", "'s", "example", "!"]) == "It's example!"
+    assert join_text_parts(np.array(["It", "'s", "example", "!"])) == "It's example!"
+    assert join_text_parts(["a", "-b", "c"], punctuations="-") == "a-b c"
+    assert join_text_parts(["Numbers", 3, "and", 4.5, "."]) == "Numbers 3 and 4.5."
+    assert join_text_parts([]) == ""
+
+
+def test_join_text_parts_same_as_concatenation():
+    rng = np.random.default_rng(0)
+    vocabulary = ["word", "Word", "'s", "n't", ".", ",", "!", "?", "(", ")", "\"", "-", "42", "é", " x"]
+    
+    for _ in range(200):
+        parts = rng.choice(vocabulary, size=rng.integers(1, 50)).tolist()
+        
+        assert join_text_parts(parts) == join_text_parts_concatenation(parts)
+        assert join_text_parts(np.array(parts)) == join_text_parts_concatenation(parts)
+        assert join_text_parts(parts, punctuations=".,") == join_text_parts_concatenation(parts, punctuations=".,")
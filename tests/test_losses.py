@@ -0,0 +1,135 @@
+import pytest
+import torch
+from typing import Optional, Tuple, Union
+
+from losses import column_wise_rmse_loss, fused_column_wise_rmse_loss, ColumnWiseRMSELoss
+
+
+def previous_column_wise_rmse_loss(
+    input: torch.Tensor, 
+    target: torch.Tensor, 
+    return_column_wise: bool = False, 
+    reduction: str = "mean", 
+    column_weight: Optional[torch.Tensor] = None, 
+    sample_weight: Optional[torch.Tensor] = None,
+    ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Implementation before the fused version, only the `torch.Tenosr` typo and the `max` reduction are fixed.
+    """
+    
+    # compute column-wise RMSE
+    squared_error = torch.square(target - input)
+    
+    # sample weightning
+    if sample_weight is not None:
+        squared_error = (squared_error * sample_weight)
+    
+    column_wise_mse = torch.mean(squared_error, dim=0)
+    column_wise_rmse = torch.sqrt(column_wise_mse)
+    
+    # column weightning
+    if column_weight is not None:
+        column_wise_rmse = (column_wise_rmse * column_weight)
+    
+    # reduction
+    if reduction == "mean":
+        loss = torch.mean(column_wise_rmse, dim=0)
+    elif reduction == "max":
+        loss = torch.max(column_wise_rmse, dim=0).values
+    else:
+        loss = column_wise_rmse
+        
+    if return_column_wise:
+        return loss, column_wise_rmse
+    
+    return loss
+
+
+LOSS_FUNCTIONS = {
+    "column_wise_rmse_loss": lambda input, target, **loss_args: column_wise_rmse_loss(input, target, **loss_args),
+    "fused_column_wise_rmse_loss": lambda input, target, **loss_args: fused_column_wise_rmse_loss(input, target, **loss_args)[0],
+    "scripted": lambda input, target, **loss_args: torch.jit.script(fused_column_wise_rmse_loss)(input, target, **loss_args)[0],
+    "ColumnWiseRMSELoss": lambda input, target, column_weight=None, sample_weight=None, reduction="mean": ColumnWiseRMSELoss(
+        column_weight=column_weight, 
+        reduction=reduction,
+    ).double()(input, target, sample_weight=sample_weight),
+}
+
+
+@pytest.fixture()
+def batch():
+    generator = torch.Generator().manual_seed(42)
+    input = torch.rand(64, 6, generator=generator, dtype=torch.float64) * 4 + 1
+    target = torch.rand(64, 6, generator=generator, dtype=torch.float64) * 4 + 1
+    column_weight = torch.rand(6, generator=generator, dtype=torch.float64)
+    sample_weight = torch.rand(64, generator=generator, dtype=torch.float64)
+    
+    return input, target, column_weight, sample_weight
+
+
+def get_loss_and_gradient(loss_function, input, target, **loss_args):
+    input = input.detach().clone().requires_grad_(True)
+    loss = loss_function(input, target, **loss_args)
+    loss.sum().backward()
+    
+    return loss.detach(), input.grad
+
+
+@pytest.mark.parametrize("name", LOSS_FUNCTIONS)
+@pytest.mark.parametrize("reduction", ["mean", "max", "none"])
+@pytest.mark.parametrize("use_column_weight", [False, True])
+def test_equal_to_previous_implementation(batch, name, reduction, use_column_weight):
+    input, target, column_weight, _ = batch
+    loss_args = dict(reduction=reduction, column_weight=column_weight if use_column_weight else None)
+    
+    loss, gradient = get_loss_and_gradient(LOSS_FUNCTIONS[name], input, target, **loss_args)
+    expected_loss, expected_gradient = get_loss_and_gradient(previous_column_wise_rmse_loss, input, target, **loss_args)
+    
+    assert torch.allclose(loss, expected_loss)
+    assert torch.allclose(gradient, expected_gradient)
+
+
+@pytest.mark.parametrize("name", LOSS_FUNCTIONS)
+@pytest.mark.parametrize("reduction", ["mean", "max", "none"])
+def test_sample_weight_is_weighted_mean(batch, name, reduction):
+    input, target, column_weight, sample_weight = batch
+    loss_function = LOSS_FUNCTIONS[name]
+    
+    loss, gradient = get_loss_and_gradient(
+        loss_function, 
+        input, 
+        target, 
+        reduction=reduction, 
+        column_weight=column_weight, 
+        sample_weight=sample_weight,
+    )
+    
+    # previously weights multiplied squared errors averaged over samples, 
+    # now they are normalized: the previous loss with weights summing to the number of samples
+    expected_loss, expected_gradient = get_loss_and_gradient(
+        previous_column_wise_rmse_loss, 
+        input, 
+        target, 
+        reduction=reduction, 
+        column_weight=column_weight, 
+        sample_weight=(sample_weight * len(sample_weight) / sample_weight.sum()).unsqueeze(-1),
+    )
+    assert torch.allclose(loss, expected_loss)
+    assert torch.allclose(gradient, expected_gradient)
+    
+    # so scaling all weights changes nothing and equal weights give the unweighted loss
+    scaled_loss = loss_function(input, target, reduction=reduction, column_weight=column_weight, sample_weight=sample_weight * 1000)
+    assert torch.allclose(scaled_loss, loss)
+    
+    equal_weights_loss = loss_function(input, target, reduction=reduction, sample_weight=torch.full_like(sample_weight, 3.0))
+    assert torch.allclose(equal_weights_loss, previous_column_wise_rmse_loss(input, target, reduction=reduction))
+
+
+def test_column_weight_buffer():
+    loss_function = ColumnWiseRMSELoss(column_weight=[1.0, 2.0], return_column_wise=True)
+    
+    assert "column_weight" in dict(loss_function.named_buffers())
+    
+    loss, column_wise_rmse = loss_function(torch.zeros(3, 2), torch.ones(3, 2))
+    assert torch.allclose(column_wise_rmse, torch.tensor([1.0, 2.0]))
+    assert torch.allclose(loss, torch.tensor(1.5))
@@ -0,0 +1,105 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+import os
+import pytest
+
+from page_cache import PageCache
+from sessions import fetch
+from ivypanda import replay_cache
+from storage import read_table
+
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures", "ivypanda")
+
+
+@pytest.fixture()
+def server():
+    """
+    Serves `state["html"]` with `state["etag"]`, answers 304 to a matching If-None-Match and records request headers.
+    """
+    
+    state = {"html": "<html>first</html>", "etag": '"v1"', "requests": []}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            state["requests"].append(dict(self.headers))
+            
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            
+            body = state["html"].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", state["etag"])
+            self.send_header("Last-Modified", "Mon, 05 Oct 2026 10:00:00 GMT")
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args) -> None:
+            pass
+    
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{http_server.server_address[1]}/page", state
+    
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def test_page_cache_persists_compressed_pages(tmp_path):
+    path = str(tmp_path / "pages.sqlite")
+    cache = PageCache(path)
+    cache.set("a", "<p>é</p>" * 1000, etag='"e"')
+    cache.set("b", "<p>b</p>", last_modified="date")
+    cache.close()
+    
+    cache = PageCache(path)
+    
+    assert cache.get("a") == {"html": "<p>é</p>" * 1000, "etag": '"e"', "last_modified": None}
+    assert cache.get("c") is None
+    assert sorted(cache.items()) == [("a", "<p>é</p>" * 1000), ("b", "<p>b</p>")]
+    assert len(cache) == 2
+    assert cache.connection.execute("SELECT LENGTH(content) FROM pages WHERE url = 'a'").fetchone()[0] < 100
+
+
+def test_fetch_revalidates_with_conditional_requests(server, tmp_path):
+    url, state = server
+    cache = PageCache(str(tmp_path / "pages.sqlite"))
+    
+    assert fetch(url, cache=cache) == "<html>first</html>"
+    assert fetch(url, cache=cache) == "<html>first</html>"
+    assert len(state["requests"]) == 1
+    
+    assert fetch(url, cache=cache, refresh=True) == "<html>first</html>"
+    assert state["requests"][-1]["If-None-Match"] == '"v1"'
+    assert state["requests"][-1]["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    
+    state["html"], state["etag"] = "<html>second</html>", '"v2"'
+    
+    assert fetch(url, cache=cache, refresh=True) == "<html>second</html>"
+    assert cache.get(url)["etag"] == '"v2"'
+    assert fetch(url, cache=cache) == "<html>second</html>"
+    assert len(state["requests"]) == 3
+
+
+def test_replay_cache_extracts_essays_offline(tmp_path):
+    with open(os.path.join(FIXTURES_DIRECTORY, "essay.html"), encoding="utf-8") as file:
+        essay_html = file.read()
+    
+    cache_path = str(tmp_path / "pages.sqlite")
+    cache = PageCache(cache_path)
+    cache.set("https://ivypanda.com/essays/essay/", essay_html)
+    cache.set("https://ivypanda.com/essays/page/1", "<html><body>Listing</body></html>")
+    cache.close()
+    
+    output_path = str(tmp_path / "essays.csv")
+    replay_cache(cache_path=cache_path, output_path=output_path)
+    essays = read_table(output_path)
+    
+    assert essays["url"].tolist() == ["https://ivypanda.com/essays/essay/"]
+    assert essays["topic"].tolist() == ["Essay on Reading Habits"]
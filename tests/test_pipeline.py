@@ -0,0 +1,31 @@
+import threading
+import time
+
+from pipeline import FetchExtractPipeline
+
+
+def extract(html: str, url: str) -> dict:
+    return {"url": url, "length": len(html)}
+
+
+def test_urls_are_consumed_on_one_thread():
+    threads = set()
+    
+    def iterate_urls():
+        for page in range(5):
+            threads.add(threading.get_ident())
+            # slow listing page, fetchers keep working on the URLs already listed
+            time.sleep(0.01)
+            yield from (f"{page}-{index}" for index in range(10))
+    
+    with FetchExtractPipeline(
+        fetch_func=lambda url: url * 2, 
+        extract_func=extract, 
+        num_fetchers=4, 
+        num_extractors=1,
+    ) as pipeline:
+        results = dict(pipeline.run(iterate_urls()))
+    
+    assert len(threads) == 1 and threading.get_ident() not in threads
+    assert results == {url: {"url": url, "length": 2 * len(url)} for url in results}
+    assert len(results) == 50
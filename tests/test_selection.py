@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+
+
+def select_k_nearest_labels_positions_loop(labels: np.ndarray, external_labels: np.ndarray, k: int = 5) -> list:
+    """
+    The notebook loop, with a stable sort so equal distances are ordered by position.
+    """
+    
+    not_selected_positions = np.arange(len(external_labels))
+    selected_positions = []
+    for sample_labels in labels:
+        if len(not_selected_positions) == 0:
+            break
+        
+        labels_difference = np.abs(external_labels[not_selected_positions] - sample_labels)
+        labels_difference_mean = np.mean(labels_difference, axis=-1)
+        nearest_positions = not_selected_positions[np.argsort(labels_difference_mean, kind="stable")[:k]]
+        selected_positions.extend(nearest_positions.tolist())
+        not_selected_positions = not_selected_positions[~np.isin(not_selected_positions, nearest_positions)]
+    
+    return selected_positions
+
+
+@pytest.mark.parametrize("num_samples, num_external_samples, k, leaf_size", [
+    (50, 1000, 5, 64), 
+    (300, 1000, 5, 16), 
+    (40, 97, 7, 8), 
+    (10, 3, 5, 64), 
+    (5, 0, 5, 64),
+])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_same_as_loop_with_ties(src_utils, num_samples, num_external_samples, k, leaf_size, seed):
+    rng = np.random.default_rng(seed)
+    # labels on the 0.5 grid give many equal distances
+    labels = rng.integers(2, 11, size=(num_samples, 6)) / 2
+    external_labels = rng.integers(2, 11, size=(num_external_samples, 6)) / 2
+    
+    positions = src_utils.select_k_nearest_labels_positions(labels, external_labels, k=k, leaf_size=leaf_size)
+    
+    assert positions.tolist() == select_k_nearest_labels_positions_loop(labels, external_labels, k=k)
+
+
+def test_same_as_loop_continuous(src_utils):
+    rng = np.random.default_rng(2)
+    labels = rng.uniform(1, 5, size=(200, 6))
+    external_labels = rng.uniform(1, 5, size=(2000, 6))
+    
+    positions = src_utils.select_k_nearest_labels_positions(labels, external_labels, k=5, leaf_size=32)
+    
+    assert positions.tolist() == select_k_nearest_labels_positions_loop(labels, external_labels, k=5)
+
+
+def test_k_larger_than_candidates_selects_everything_once(src_utils):
+    external_labels = np.array([[3.0, 3.0], [1.0, 1.0], [2.0, 2.0]])
+    
+    positions = src_utils.select_k_nearest_labels_positions(np.array([[1.0, 1.0], [2.0, 2.0]]), external_labels, k=5)
+    
+    assert positions.tolist() == [1, 2, 0]
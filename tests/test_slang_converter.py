@@ -0,0 +1,41 @@
+import pytest
+
+from slang_converter import SlangConverter
+
+
+def get_key_texts(converter: SlangConverter) -> list:
+    keys = [key for pair in converter.pairs for key in pair]
+    templates = [" {} ", " I {}, you're late. ", " {} {} ", " {}. {}! ", "{} "]
+    
+    texts = [template.format(key, key) for key in keys for template in templates]
+    texts += [template.format(key.upper(), key.capitalize()) for key in keys for template in templates[:1]]
+    
+    return texts
+
+
+@pytest.mark.parametrize("convert_full_to_slang", [False, True])
+def test_compiled_same_as_per_key_path(convert_full_to_slang):
+    compiled_converter = SlangConverter(convert_full_to_slang=convert_full_to_slang, compiled=True, p=1.0)
+    converter = SlangConverter(convert_full_to_slang=convert_full_to_slang, compiled=False, p=1.0)
+    
+    for text in get_key_texts(converter) + [" I can't go, you're late. "]:
+        assert compiled_converter.transform(text) == converter.transform(text), text
+
+
+@pytest.mark.parametrize("convert_full_to_slang", [False, True])
+def test_boundaries_are_consumed(convert_full_to_slang):
+    slang_dict = {"can't": "cannot", "cant": "cannot", "you're": "you are"}
+    compiled_converter = SlangConverter(slang_dict=slang_dict, convert_full_to_slang=convert_full_to_slang, compiled=True, p=1.0)
+    converter = SlangConverter(slang_dict=slang_dict, convert_full_to_slang=convert_full_to_slang, compiled=False, p=1.0)
+    
+    for text in [" can't can't ", " I can't go, you're late. ", " cannot cannot ", " You're CAN'T ", " decant, cant. "]:
+        assert compiled_converter.transform(text) == converter.transform(text), text
+        
+    if not convert_full_to_slang:
+        assert compiled_converter.transform(" can't can't ") == " cannot can't "
+
+
+def test_word_level_without_replacements():
+    converter = SlangConverter(level="word", compiled=True, p=0.0)
+    
+    assert converter.transform(" I can't go, you're late. ") == " I can't go, you're late. "
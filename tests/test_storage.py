@@ -0,0 +1,78 @@
+import pytest
+import pandas as pd
+
+from storage import get_format, write_table, read_table, iterate_table_chunks, append_table, check_appendable, ParquetPartsWriter
+from constants import IVYPANDA_SCHEMA
+
+
+def get_essays(num_essays: int = 10) -> pd.DataFrame:
+    return pd.DataFrame({
+        "url": [f"https://example.com/{index}" for index in range(num_essays)], 
+        "topic": [f"Topic {index}" for index in range(num_essays)], 
+        "text": [f'Line "{index}",\n\nnext paragraph' for index in range(num_essays)], 
+        "subject": [["Education", "Literature"][:index % 2 + 1] for index in range(num_essays)], 
+        "type": ["Essay" if index < num_essays // 2 else "Report" for index in range(num_essays)],
+    })
+
+
+def test_get_format(tmp_path):
+    (tmp_path / "parts").mkdir()
+    
+    assert [get_format(path) for path in ("a.csv", "a.parquet", "a.pq", "a.feather", "a.arrow")] == ["csv", "parquet", "parquet", "arrow", "arrow"]
+    assert get_format(str(tmp_path / "parts")) == "parquet"
+    assert get_format(str(tmp_path / "missing")) == "csv"
+
+
+@pytest.mark.parametrize("name", ["essays.parquet", "essays.feather"])
+def test_typed_round_trip_and_columns(tmp_path, name):
+    essays = get_essays()
+    path = str(tmp_path / name)
+    
+    write_table(essays, path, schema=IVYPANDA_SCHEMA)
+    
+    assert read_table(path).assign(subject=lambda data_frame: data_frame["subject"].map(list)).equals(essays)
+    assert read_table(path, columns=["text"]).columns.tolist() == ["text"]
+    assert read_table(path, columns=["text"])["text"].tolist() == essays["text"].tolist()
+
+
+def test_partitions_and_chunks(tmp_path):
+    essays = get_essays()
+    path = str(tmp_path / "essays")
+    
+    write_table(essays.drop(columns="subject"), path, partition_columns=["type"])
+    chunks = list(iterate_table_chunks(path, chunk_size=3, columns=["url", "type"]))
+    data_frame = pd.concat(chunks).sort_values("url")
+    
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert data_frame["url"].tolist() == sorted(essays["url"])
+    assert dict(zip(data_frame["url"], data_frame["type"].astype(str))) == dict(zip(essays["url"], essays["type"]))
+    assert set(read_table(path, filters=[("type", "=", "Essay")])["url"]) == set(essays["url"][:5])
+    
+    with pytest.raises(ValueError):
+        write_table(essays, str(tmp_path / "essays.csv"), partition_columns=["type"])
+
+
+@pytest.mark.parametrize("name", ["essays.csv", "essays.parquet"])
+def test_append_table(tmp_path, name):
+    essays = get_essays().drop(columns="subject")
+    path = str(tmp_path / name)
+    
+    append_table(essays[:4], path)
+    append_table(essays[4:], path)
+    
+    assert read_table(path).sort_values("url").reset_index(drop=True).equals(essays.sort_values("url").reset_index(drop=True))
+    assert sum(len(chunk) for chunk in iterate_table_chunks(path, chunk_size=3)) == len(essays)
+
+
+def test_parquet_parts_writer_and_appendable(tmp_path):
+    path = str(tmp_path / "essays.parquet")
+    writer = ParquetPartsWriter(path, rows_per_part=4, schema=IVYPANDA_SCHEMA)
+    for essay in get_essays().to_dict("records"):
+        writer.write(essay)
+    writer.close()
+    
+    assert len(read_table(path)) == 10
+    assert read_table(path)["subject"].map(list).tolist() == get_essays()["subject"].tolist()
+    
+    with pytest.raises(ValueError):
+        check_appendable(str(tmp_path / "essays.feather"))
@@ -0,0 +1,67 @@
+import pytest
+import pandas as pd
+
+from google_translate_back_translation import stream_back_translation
+from storage import read_table
+
+
+class FailingBackTranslation:
+    """
+    Reverses texts, fails on the `fail_call`-th call to simulate a crashed job.
+    """
+    
+    def __init__(self, fail_call: int = None) -> None:
+        self.fail_call = fail_call
+        self.texts = []
+        
+    def __call__(self, texts):
+        if len(self.texts) + 1 == self.fail_call:
+            raise ConnectionError("Translation failure")
+        
+        self.texts.append(list(texts))
+        
+        return [text[::-1] for text in texts]
+
+
+@pytest.mark.parametrize("output_name", ["output.csv", "output.parquet"])
+def test_restart_resumes_from_output(tmp_path, output_name):
+    data_frame = pd.DataFrame({"text_id": [f"id{index}" for index in range(10)], "text": [f"text {index}" for index in range(10)]})
+    data_frame_path = str(tmp_path / "input.csv")
+    data_frame.to_csv(data_frame_path, index=False)
+    output_path = str(tmp_path / output_name)
+    
+    with pytest.raises(ConnectionError):
+        stream_back_translation(FailingBackTranslation(fail_call=3), data_frame_path, output_path, chunk_size=3)
+    
+    assert len(read_table(output_path)) == 6
+    
+    back_translation = FailingBackTranslation()
+    stream_back_translation(back_translation, data_frame_path, output_path, chunk_size=3)
+    output = read_table(output_path).sort_values("text_id").reset_index(drop=True)
+    
+    assert back_translation.texts == [["text 6", "text 7", "text 8"], ["text 9"]]
+    assert output["text_id"].tolist() == data_frame["text_id"].tolist()
+    assert output["back_translated_text"].tolist() == [text[::-1] for text in data_frame["text"]]
+    
+    stream_back_translation(back_translation, data_frame_path, output_path, chunk_size=3)
+    
+    assert len(back_translation.texts) == 2
+    assert len(read_table(output_path)) == 10
+
+
+def test_multi_language_columns(tmp_path):
+    data_frame_path = str(tmp_path / "input.csv")
+    pd.DataFrame({"text_id": ["a", "b"], "text": ["one", "two"]}).to_csv(data_frame_path, index=False)
+    output_path = str(tmp_path / "output.csv")
+    
+    back_translate_func = lambda texts: {"fr": [text.upper() for text in texts], "de": list(texts)}
+    stream_back_translation(back_translate_func, data_frame_path, output_path)
+    output = read_table(output_path)
+    
+    assert output["back_translated_text_fr"].tolist() == ["ONE", "TWO"]
+    assert output["back_translated_text_de"].tolist() == ["one", "two"]
+
+
+def test_output_must_be_appendable(tmp_path):
+    with pytest.raises(ValueError):
+        stream_back_translation(FailingBackTranslation(), str(tmp_path / "input.csv"), str(tmp_path / "output.feather"))
@@ -0,0 +1,180 @@
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+from functools import partial
+import threading
+import time
+import os
+import pytest
+
+import studentshare
+from studentshare import wait, login, filter_results, wait_for_results, get_first_essay_block, get_essays_urls, create_driver
+from studentshare import get_essays_concurrently, session_from_driver, extract_essay_info
+
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures", "studentshare")
+
+
+def test_wait_sleeps_only_without_explicit_waits(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(studentshare.time, "sleep", sleeps.append)
+    
+    wait(driver=None, delay=3.0, condition=lambda driver: True, explicit_waits=True)
+    assert sleeps == []
+    
+    wait(driver=None, delay=3.0, condition=lambda driver: True, explicit_waits=False)
+    assert sleeps == [3.0]
+
+
+@pytest.fixture()
+def site():
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=FIXTURES_DIRECTORY))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def driver():
+    chrome_driver_path = os.environ.get("CHROME_DRIVER_PATH")
+    if chrome_driver_path is None:
+        pytest.skip("set CHROME_DRIVER_PATH to run browser tests")
+    
+    driver = create_driver(chrome_driver_path=chrome_driver_path, headless=True)
+    
+    yield driver
+    
+    driver.quit()
+
+
+def test_login_and_filters_with_explicit_waits(site, driver):
+    """
+    The mock site shows every next input only after the previous step, 
+    so the flow passes only by waiting for the elements, and fast only without fixed delays.
+    """
+    
+    start_time = time.perf_counter()
+    
+    login(
+        driver, 
+        email="email", 
+        password="password", 
+        url=f"{site}/login.html", 
+        loading_page_delay=10.0, 
+        input_delay=10.0, 
+        explicit_waits=True, 
+        timeout=5.0,
+    )
+    assert driver.current_url == f"{site}/filters.html"
+    
+    # as in `parse`, the listing is opened once logged in
+    driver.get(f"{site}/filters.html")
+    old_essay_block = get_first_essay_block(driver)
+    filter_results(driver, levels=["College"], explicit_waits=True, timeout=5.0)
+    wait_for_results(driver, old_essay_block=old_essay_block, delay=10.0, explicit_waits=True, timeout=5.0)
+    
+    assert get_essays_urls(driver) == [f"{site}/essays/College.html"]
+    assert time.perf_counter() - start_time < 5.0
+
+
+class FakeDriver:
+    def get_cookies(self) -> list:
+        return [{"name": "session", "value": "logged-in", "domain": "127.0.0.1", "path": "/"}]
+
+
+@pytest.fixture()
+def essays_site():
+    """
+    Serves essays only to the logged-in session, '/flaky' fails once with 503, '/broken' has no essay.
+    """
+    
+    with open(os.path.join(FIXTURES_DIRECTORY, "essay.html"), mode="rb") as file:
+        essay_html = file.read()
+    
+    state = {"num_in_flight": 0, "max_in_flight": 0, "flaky_requests": 0, "lock": threading.Lock()}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            with state["lock"]:
+                state["num_in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["num_in_flight"])
+            
+            time.sleep(0.02)
+            
+            with state["lock"]:
+                state["num_in_flight"] -= 1
+                if self.path == "/flaky":
+                    state["flaky_requests"] += 1
+            
+            if "session=logged-in" not in self.headers.get("Cookie", ""):
+                status, body = 403, b""
+            elif self.path == "/flaky" and state["flaky_requests"] == 1:
+                status, body = 503, b""
+            elif self.path == "/missing":
+                status, body = 404, b""
+            elif self.path == "/broken":
+                status, body = 200, b"<html><body>No essay</body></html>"
+            else:
+                status, body = 200, essay_html
+            
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args) -> None:
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_essays_concurrently(essays_site):
+    base_url, state = essays_site
+    essays_urls = [f"{base_url}/essays/{index}" for index in range(20)] + [f"{base_url}/{path}" for path in ("flaky", "missing", "broken")]
+    session = session_from_driver(FakeDriver(), pool_size=4)
+    
+    essays, failures = get_essays_concurrently(essays_urls=(url for url in essays_urls), session=session, max_workers=4)
+    
+    assert sorted(essay["url"] for essay in essays) == sorted(essays_urls[:20] + [f"{base_url}/flaky"])
+    assert all(essay["topic"] == "Online Learning" and essay["level"] == "College" for essay in essays)
+    assert failures == {"http_error": 1, "extraction_error": 1}
+    assert state["flaky_requests"] == 2
+    assert 1 < state["max_in_flight"] <= 4
+
+
+def test_essays_require_browser_cookies(essays_site):
+    base_url, _ = essays_site
+    session = session_from_driver(FakeDriver())
+    session.cookies.clear()
+    
+    essays, failures = get_essays_concurrently(essays_urls=[f"{base_url}/essays/0"], session=session, max_workers=2)
+    
+    assert essays == [] and failures == {"http_error": 1}
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_extract_essay_info(backend):
+    with open(os.path.join(FIXTURES_DIRECTORY, "essay.html"), encoding="utf-8") as file:
+        essay = extract_essay_info(html=file.read(), url="essay.html", backend=backend)
+    
+    assert essay == {
+        "url": "essay.html", 
+        "topic": "Online Learning", 
+        "text": "Online courses give students flexible schedules.\n\nThey also require more self-discipline.", 
+        "subject": "Education", 
+        "type": "Essay", 
+        "level": "College",
+    }
@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+
+from transform import Transform
+from keyword_replacer import KeywordReplacer
+
+
+class Upper(Transform):
+    def transform(self, text: str) -> str:
+        return text.upper()
+
+
+def get_texts(num_texts: int = 1000) -> list:
+    return [f"text {index}" for index in range(num_texts)]
+
+
+def test_apply_mask_probability():
+    assert not Upper(p=0.0).get_apply_mask(100, np.random.default_rng(0)).any()
+    assert Upper(p=1.0).get_apply_mask(100, np.random.default_rng(0)).all()
+    assert 0.25 < Upper(p=0.3).get_apply_mask(10000, np.random.default_rng(0)).mean() < 0.35
+    
+    with pytest.raises(ValueError):
+        Upper(p=1.5)
+
+
+def test_apply_batch_transforms_only_masked_texts():
+    texts = get_texts()
+    
+    transformed_texts = Upper(p=0.5).apply_batch(texts, rng=np.random.default_rng(0))
+    apply_mask = Upper(p=0.5).get_apply_mask(len(texts), np.random.default_rng(0))
+    
+    assert transformed_texts == [text.upper() if does_apply else text for text, does_apply in zip(texts, apply_mask)]
+
+
+def test_seeded_transforms_are_reproducible():
+    texts = get_texts()
+    
+    assert Upper(p=0.5, seed=3)(texts) == Upper(p=0.5, seed=3)(texts)
+    assert Upper(p=0.5, seed=3)(texts) != Upper(p=0.5, seed=4)(texts)
+    assert [Upper(p=0.5, seed=3)(text) for text in texts[:20]] == [Upper(p=0.5, seed=3)(text) for text in texts[:20]]
+
+
+def test_word_level_always_applies_and_draws_per_key():
+    keywords = {"cat": ["dog"], "red": ["blue"]}
+    texts = ["red cat"] * 200
+    
+    transformed_texts = KeywordReplacer(keywords, level="word", p=0.5, seed=0).apply_batch(texts)
+    
+    assert set(transformed_texts) == {"red cat", "red dog", "blue cat", "blue dog"}
+    assert transformed_texts == KeywordReplacer(keywords, level="word", p=0.5, seed=0).apply_batch(texts)
+    assert KeywordReplacer(keywords, level="word", p=0.5).get_apply_mask(10, np.random.default_rng(0)).all()
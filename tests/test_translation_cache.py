@@ -0,0 +1,72 @@
+import itertools
+from types import SimpleNamespace
+
+import translation_cache
+from translation_cache import TranslationCache
+from google_translate_back_translation import GoogleTranslateBackTranslation
+
+
+class CountingTranslator:
+    def __init__(self) -> None:
+        self.num_calls = 0
+    
+    def translate(self, text: str, src: str, dest: str) -> SimpleNamespace:
+        self.num_calls += 1
+        
+        return SimpleNamespace(text=f"{text} ({dest})")
+
+
+def test_get_set_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TranslationCache(path)
+    cache.set("Hello", "en", "fr", "Bonjour")
+    
+    assert cache.get("Hello", "en", "fr") == "Bonjour"
+    assert cache.get("Hello", "en", "de") is None
+    assert cache.get("Hello!", "en", "fr") is None
+    
+    cache.set("Hello", "en", "fr", "Salut")
+    cache.close()
+    
+    cache = TranslationCache(path)
+    
+    assert cache.get("Hello", "en", "fr") == "Salut"
+    assert len(cache) == 1
+    assert cache.size == len("Hello") + len("Salut")
+
+
+def test_least_recently_used_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(translation_cache.time, "time", lambda: float(next(clock)))
+    cache = TranslationCache(str(tmp_path / "cache.sqlite"), max_size=30)
+    
+    cache.set("a" * 5, "en", "fr", "b" * 5)
+    cache.set("c" * 5, "en", "fr", "d" * 5)
+    cache.set("e" * 5, "en", "fr", "f" * 5)
+    cache.get("a" * 5, "en", "fr")
+    cache.set("g" * 5, "en", "fr", "h" * 5)
+    
+    assert cache.get("c" * 5, "en", "fr") is None
+    assert [cache.get(text * 5, "en", "fr") for text in "aeg"] == ["b" * 5, "f" * 5, "h" * 5]
+    assert cache.size == 30
+
+
+def test_back_translation_reads_cache(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite"))
+    texts = ["First text.", "Second text."]
+    
+    back_translated_texts = []
+    for _ in range(2):
+        translator = CountingTranslator()
+        back_translation = GoogleTranslateBackTranslation(
+            translator=translator, 
+            delay=0.0, 
+            segment_delay=0.0, 
+            translations_delay=0.0, 
+            cache=cache, 
+            p=1.0,
+        )
+        back_translated_texts.append([back_translation.transform(text) for text in texts])
+    
+    assert back_translated_texts[0] == back_translated_texts[1] == ["First text. (fr) (en)", "Second text. (fr) (en)"]
+    assert translator.num_calls == 0
@@ -0,0 +1,172 @@
+import pytest
+import numpy as np
+import pandas as pd
+from typing import List, Union
+from collections.abc import Iterable
+
+
+def basic_selection_copying(
+    data_frame: pd.DataFrame, 
+    min_words: int = 150, 
+    max_words: int = 1700, 
+    types: Union[str, List[str]] = "Essay",
+    text_column: str = "full_text",
+    type_column: str = "type", 
+) -> pd.DataFrame:
+    """
+    The original selection by per-row word counting, with duplicates dropped by `text_column`.
+    """
+    
+    data_frame = data_frame.copy()
+    data_frame["num_words"] = data_frame[text_column].apply(lambda text: len(str(text).split()))
+    data_frame = data_frame[(min_words < data_frame["num_words"]) & (data_frame["num_words"] < max_words)]
+    
+    if isinstance(types, str):
+        types_mask = data_frame[type_column].str.contains(types)
+    elif isinstance(types, Iterable):
+        types_mask = data_frame[type_column].isin(types)
+    else:
+        types_mask = np.ones(shape=data_frame.shape[0], dtype=bool)
+    
+    data_frame = data_frame[data_frame[type_column].isna() | types_mask]
+    
+    return data_frame.drop_duplicates(subset=[text_column])
+
+
+def get_essays(num_essays: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    texts = [" ".join(["word"] * rng.integers(0, 30)) + f" {rng.integers(20)}" for _ in range(num_essays)]
+    texts = [text if index % 50 else np.nan for index, text in enumerate(texts)]
+    types = rng.choice(["Essay", "Research Essay", "Report", None], size=num_essays)
+    
+    return pd.DataFrame({"text": texts, "type": types, "id": np.arange(num_essays)})
+
+
+def test_get_num_words(src_utils):
+    texts = pd.Series(["one two  three", "", "  ", "line\nbreak\ttab", np.nan, None])
+    
+    assert src_utils.get_num_words(texts).tolist() == [len(str(text).split()) for text in texts]
+
+
+def test_basic_selection_same_as_copying_selection(src_utils):
+    data_frame = get_essays()
+    
+    for types in ["Essay", ["Report", "Essay"], None]:
+        expected = basic_selection_copying(data_frame, min_words=5, max_words=25, types=types, text_column="text")
+        selected = src_utils.basic_selection(data_frame, min_words=5, max_words=25, types=types, text_column="text", drop_extra_columns=False)
+        
+        pd.testing.assert_frame_equal(selected, expected)
+        pd.testing.assert_frame_equal(
+            src_utils.basic_selection(data_frame, min_words=5, max_words=25, types=types, text_column="text"), 
+            expected.drop(columns="num_words"),
+        )
+    
+    assert "num_words" not in data_frame.columns
+
+
+def test_iterate_basic_selection_drops_duplicates_across_chunks(src_utils, tmp_path):
+    data_frame = get_essays()
+    expected = src_utils.basic_selection(data_frame, min_words=5, max_words=25, text_column="text")
+    path = str(tmp_path / "essays.parquet")
+    src_utils.write_table(data_frame, path)
+    
+    chunks = list(src_utils.iterate_basic_selection(path, chunk_size=64, min_words=5, max_words=25, text_column="text"))
+    
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert pd.concat(chunks)["id"].tolist() == expected["id"].tolist()
+
+
+def convert_soft_to_hard_predictions_digitize(soft_predictions: np.ndarray, bins: list, labels: list) -> np.ndarray:
+    """
+    Element-wise lookup of the `np.digitize` bins.
+    """
+    
+    indexes = np.digitize(np.clip(soft_predictions, a_min=0.0, a_max=5.0), bins=bins, right=True)
+    
+    return np.asarray(labels)[np.maximum(indexes - 1, 0)]
+
+
+def get_soft_predictions(dtype: type, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    bins = np.array([0.0, 0.25, 0.75, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.25, 4.75, 5.0], dtype=dtype)
+    boundaries = np.concatenate([bins, np.nextafter(bins, -np.inf), np.nextafter(bins, np.inf), [-1.0, 6.0]]).astype(dtype)
+    values = np.concatenate([rng.uniform(-0.5, 5.5, size=6000).astype(dtype), np.tile(boundaries, 6)])
+    
+    return values[:len(values) // 6 * 6].reshape(-1, 6)
+
+
+def test_convert_soft_to_hard_predictions_same_as_digitize(src_utils):
+    for dtype in (np.float32, np.float64):
+        soft_predictions = get_soft_predictions(dtype)
+        expected = convert_soft_to_hard_predictions_digitize(soft_predictions, src_utils.DEFAULT_BINS, src_utils.DEFAULT_LABELS)
+        
+        hard_predictions = src_utils.convert_soft_to_hard_predictions(soft_predictions)
+        
+        assert hard_predictions.shape == soft_predictions.shape and hard_predictions.dtype == dtype
+        np.testing.assert_array_equal(hard_predictions, expected)
+    
+    bins, labels = [0.0, 1.0, 2.5], [0.0, 2.0, 5.0]
+    soft_predictions = get_soft_predictions(np.float64)
+    np.testing.assert_array_equal(
+        src_utils.convert_soft_to_hard_predictions(soft_predictions, bins=bins, labels=labels), 
+        convert_soft_to_hard_predictions_digitize(soft_predictions, bins, labels),
+    )
+
+
+def test_convert_soft_to_hard_predictions_in_place_and_chunked(src_utils, tmp_path):
+    soft_predictions = get_soft_predictions(np.float32)
+    expected = src_utils.convert_soft_to_hard_predictions(soft_predictions)
+    
+    path = str(tmp_path / "predictions.npy")
+    np.save(path, soft_predictions)
+    predictions = np.load(path, mmap_mode="r+")
+    hard_predictions = src_utils.convert_soft_to_hard_predictions(predictions, out=predictions, chunk_size=100)
+    predictions.flush()
+    
+    assert hard_predictions is predictions
+    np.testing.assert_array_equal(np.load(path), expected)
+    np.testing.assert_array_equal(src_utils.convert_soft_to_hard_predictions(soft_predictions.tolist()), expected.astype(np.float64))
+
+
+def test_streaming_confident_predictions_same_as_stacked(src_utils, tmp_path):
+    rng = np.random.default_rng(0)
+    targets = ["cohesion", "syntax", "vocabulary", "phraseology", "grammar", "conventions"]
+    base_predictions = rng.uniform(1, 5, size=(1000, 6))
+    models_predictions = [base_predictions + rng.normal(scale=rng.uniform(0.01, 0.3, size=(1000, 1)), size=(1000, 6)) for _ in range(7)]
+    
+    predictions_paths = []
+    for index, predictions in enumerate(models_predictions):
+        if index % 2 == 0:
+            predictions_paths.append(str(tmp_path / f"model_{index}.npy"))
+            np.save(predictions_paths[-1], predictions)
+        else:
+            predictions_paths.append(str(tmp_path / f"model_{index}.parquet"))
+            data_frame = pd.DataFrame(predictions, columns=targets).assign(text_id=np.arange(1000))
+            src_utils.write_table(data_frame, predictions_paths[-1])
+    
+    stacked_predictions = np.stack(models_predictions)
+    std = np.std(stacked_predictions, axis=0)
+    
+    for confidence_threshold in (0.1, [0.05, 0.1, 0.1, 0.15, 0.1, 0.2]):
+        confidence_mask, indexes, mean = src_utils.get_streaming_confident_predictions(
+            predictions_paths, 
+            confidence_threshold=confidence_threshold, 
+            columns=targets, 
+            chunk_size=128,
+        )
+        
+        np.testing.assert_allclose(mean, stacked_predictions.mean(axis=0))
+        np.testing.assert_array_equal(confidence_mask, std < np.asarray(confidence_threshold))
+        np.testing.assert_array_equal(indexes, np.flatnonzero(confidence_mask.all(axis=1)))
+        assert 0 < len(indexes) < 1000
+
+
+def test_streaming_confident_predictions_checks_inputs(src_utils, tmp_path):
+    np.save(tmp_path / "first.npy", np.zeros((10, 6)))
+    np.save(tmp_path / "second.npy", np.zeros((11, 6)))
+    
+    with pytest.raises(ValueError):
+        src_utils.get_streaming_confident_predictions([str(tmp_path / "first.npy"), str(tmp_path / "second.npy")])
+    
+    with pytest.raises(ValueError):
+        src_utils.get_streaming_confident_predictions([])